@@ -1,6 +1,4 @@
-import itertools
 import random
-import copy
 
 
 class Minesweeper():
@@ -90,17 +88,23 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    Sentences are immutable and hashable, so marking a cell
+    returns a new sentence.
     """
 
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = frozenset(cells)
         self.count = count
 
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((self.cells, self.count))
+
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{set(self.cells)} = {self.count}"
 
     def known_mines(self):
         """
@@ -108,7 +112,7 @@ class Sentence():
         """
 
         if len(self.cells) == self.count and len(self.cells) != 0:
-            return self.cells
+            return set(self.cells)
         
         return set()
 
@@ -119,31 +123,31 @@ class Sentence():
         """
 
         if self.count == 0 and len(self.cells) != 0:
-            return self.cells
+            return set(self.cells)
         
         return set()
 
 
     def mark_mine(self, cell):
         """
-        Updates internal knowledge representation given the fact that
+        Returns the sentence that follows from the fact that
         a cell is known to be a mine.
         """
 
-
         if cell in self.cells:
-            self.cells.remove(cell)
-            self.count -= 1
+            return Sentence(self.cells - {cell}, self.count - 1)
+        return self
 
 
     def mark_safe(self, cell):
         """
-        Updates internal knowledge representation given the fact that
+        Returns the sentence that follows from the fact that
         a cell is known to be safe.
         """
 
         if cell in self.cells:
-            self.cells.remove(cell)
+            return Sentence(self.cells - {cell}, self.count)
+        return self
 
 
 class MinesweeperAI():
@@ -164,8 +168,20 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Set of sentences about the game known to be true
+        self.knowledge = set()
+
+        # Maps each cell to the set of sentences that contain it
+        self.sentences_with = {}
+
+        # Sentences added since inference last looked at them
+        self.changed = []
+
+        # Size of the knowledge base after each move, and how many
+        # sentences were added or turned away as already known
+        self.knowledge_sizes = []
+        self.sentences_added = 0
+        self.duplicates = 0
 
     def mark_mine(self, cell):
         """
@@ -173,8 +189,10 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        # Only the sentences that contain the cell change
+        for sentence in self.sentences_with.pop(cell, set()):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
@@ -182,8 +200,92 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        for sentence in self.sentences_with.pop(cell, set()):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_safe(cell))
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and the index of its cells,
+        unless it is empty or already known.
+        """
+        if not sentence.cells:
+            return
+        if sentence in self.knowledge:
+            self.duplicates += 1
+            return
+
+        self.knowledge.add(sentence)
+        self.sentences_added += 1
+        for cell in sentence.cells:
+            self.sentences_with.setdefault(cell, set()).add(sentence)
+        self.changed.append(sentence)
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge base and the index of its cells.
+        """
+        self.knowledge.discard(sentence)
+        for cell in sentence.cells:
+            sentences = self.sentences_with.get(cell)
+            if sentences is not None:
+                sentences.discard(sentence)
+                if not sentences:
+                    del self.sentences_with[cell]
+
+    def neighbors(self, sentence):
+        """
+        Returns the other sentences that share at least one cell with a sentence.
+        """
+        found = set()
+        for cell in sentence.cells:
+            found.update(self.sentences_with.get(cell, ()))
+        found.discard(sentence)
+        return found
+
+    def knowledge_stats(self):
+        """
+        Returns the current and largest size of the knowledge base, its size
+        after each move, and how many sentences were added or were duplicates.
+        """
+        return {
+            "size": len(self.knowledge),
+            "peak": max(self.knowledge_sizes, default=0),
+            "sizes": list(self.knowledge_sizes),
+            "added": self.sentences_added,
+            "duplicates": self.duplicates,
+        }
+
+    def infer(self):
+        """
+        Draws every conclusion that follows from the changed sentences:
+        marks the cells they settle and adds the sentences that follow
+        from one of them being a subset of another.
+        """
+        while self.changed:
+            sentence = self.changed.pop()
+            # Marking may have replaced it since it was queued
+            if sentence not in self.knowledge:
+                continue
+
+            # Marking replaces the sentences with those cells, which queues the new ones
+            mines = list(sentence.known_mines())
+            safes = list(sentence.known_safes())
+            for mine in mines:
+                self.mark_mine(mine)
+            for safe in safes:
+                self.mark_safe(safe)
+            if mines or safes:
+                continue
+
+            # Only sentences sharing a cell can be subsets of each other
+            for other in self.neighbors(sentence):
+                if len(other.cells) == len(sentence.cells):
+                    continue
+                if sentence.cells.issubset(other.cells):
+                    self.add_sentence(Sentence(other.cells - sentence.cells, other.count - sentence.count))
+                elif sentence.cells.issuperset(other.cells):
+                    self.add_sentence(Sentence(sentence.cells - other.cells, sentence.count - other.count))
 
     def add_knowledge(self, cell, count):
         """
@@ -214,7 +316,7 @@ class MinesweeperAI():
 
         #3
         # add sentence to knowledge
-        new_sentence = Sentence(set(), count)
+        cells = set()
 
         for i in range(cell[0]-1, cell[0]+2):
             # check if row in range
@@ -231,79 +333,22 @@ class MinesweeperAI():
 
                 # If new_cell in known to be a mine, reduce count by one and do not inlude it in the sentence
                 if new_cell in self.mines:
-                    new_sentence.count -= 1
+                    count -= 1
                 # Else if new_cell is known to be not a safe cell (unclear if safe or mine), add it to the sentence
                 elif new_cell not in self.safes:
-                    new_sentence.cells.add(new_cell)
-
-        # add new sentence to knowledge            
-        self.knowledge.append(new_sentence)
-
-
-        # print("Knowledge before checking:")
-        # for i, sentence in enumerate(self.knowledge):
-        #     print("    " + str(i) + " - " + str(sentence))
-
-        # 4
-        # mark additional cells as safe or as mines
-        changed = True
-        while changed:
-            changed = False
+                    cells.add(new_cell)
 
-            new_safe_or_mine = True
-            while new_safe_or_mine:
-                new_safe_or_mine = False
-        
-                for sentence in self.knowledge:
-                    known_safes = copy.deepcopy(sentence.known_safes())
-                    #print(f"Known safes: {known_safes}")
-                    if known_safes:
-                        new_safe_or_mine = True
-                        for safe_cell in known_safes:
-                            #print(f"Safe cell - {safe_cell}")
-                            self.mark_safe(safe_cell)
-                        # self.knowledge.remove(sentence)
-
-                    
-                    known_mines = copy.deepcopy(sentence.known_mines())
-                    #print(f"Known mines: {known_mines}")
-                    if known_mines:
-                        new_safe_or_mine = True
-                        for mine in known_mines:
-                            self.mark_mine(mine)
-                        # self.knowledge.remove(sentence)
-
-
-            self.knowledge[:] = [sentence for sentence in self.knowledge if len(sentence.cells) != 0]
-
-            for s1, s2, in itertools.combinations(self.knowledge, 2):
-
-                if len(s1.cells) == 0 or len(s2.cells) == 0 or len(s1.cells) == len(s2.cells):
-                    continue
-
-                if s1.cells.issubset(s2.cells):
-                    #print(f"subset found {s1} - {s1}")
-                    changed = True
-                    self.knowledge.append(Sentence(s2.cells - s1.cells, s2.count - s1.count))
-                elif s1.cells.issuperset(s2.cells):
-                    #print(f"superset found {s1} - {s2}")
-                    changed = True
-                    self.knowledge.append(Sentence(s1.cells - s2.cells, s1.count - s2.count))
-        
-        
-        
-        # print("Knowledge after checking:")
-        # for i, sentence in enumerate(self.knowledge):
-        #     print("    " + str(i) + " - " + str(sentence))
-        
-        
-        # print(f"Safes: {self.safes}")
-        # print(f"Mines: {self.mines}")
-        # print(f"Moves made: {self.moves_made}")
-        # print(f"Safes - Moves made: {self.safes - self.moves_made}")
+        # add new sentence to knowledge
+        self.add_sentence(Sentence(cells, count))
 
-        # print("-------------------------------------------------------------------------")
+        # 4, 5
+        # mark additional cells as safe or as mines, and add inferred
+        # sentences, starting from the sentences that just changed
+        self.infer()
 
+        self.knowledge_sizes.append(len(self.knowledge))
+        print(f"Knowledge base: {len(self.knowledge)} sentences, "
+              f"{self.sentences_added} added, {self.duplicates} duplicates")
 
 
     def make_safe_move(self):
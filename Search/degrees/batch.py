@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import degrees
+
+# Search mode used by each worker, set by init_worker
+mode = None
+
+# Whether queries name people instead of giving their person_ids
+by_name = False
+
+
+def read_pairs(f):
+    """
+    Yields (source, target) pairs from lines of a file, either as JSON
+    objects {"source": ..., "target": ...} or as two whitespace or comma
+    separated ids. Names, which may contain spaces, need the JSON form.
+    """
+    for line in f:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            query = json.loads(line)
+            yield query["source"], query["target"]
+        else:
+            source, target = line.replace(",", " ").split()
+            yield source, target
+
+
+def init_worker(directory, search_mode, names=False):
+    """
+    Loads the graph in a worker process.
+
+    The graph comes from the memory-mapped snapshot, so every worker
+    shares the same read-only pages instead of holding its own copy.
+    """
+    global mode, by_name
+    mode = search_mode
+    by_name = names
+    degrees.load_graph(directory)
+    if mode == "graph-astar":
+        degrees.load_landmarks(directory)
+
+
+def answer(chunk):
+    """
+    Returns one result dict per (index, source, target) query in the chunk.
+    """
+    results = []
+    for i, source, target in chunk:
+        result = {"index": i, "source": source, "target": target}
+        start = time.perf_counter()
+        if by_name:
+            # Resolve names to the closest match, typos included
+            source = result["source_id"] = degrees.resolve_name(source)
+            target = result["target_id"] = degrees.resolve_name(target)
+        if source is None or target is None:
+            result["error"] = "person not found"
+        elif degrees.graph.person_index(source) is None:
+            result["error"] = f"unknown person {source}"
+        elif degrees.graph.person_index(target) is None:
+            result["error"] = f"unknown person {target}"
+        else:
+            path = degrees.search_modes[mode](source, target)
+            result["degrees"] = None if path is None else len(path)
+            result["path"] = path
+        result["seconds"] = time.perf_counter() - start
+        results.append(result)
+    return results
+
+
+def chunks(pairs, size):
+    """
+    Groups numbered pairs into lists of up to `size` (index, source, target) queries.
+    """
+    chunk = []
+    for i, (source, target) in enumerate(pairs):
+        chunk.append((i, source, target))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run(directory, pairs, mode="graph-bidirectional", workers=None, ordered=False,
+        chunk_size=64, names=False):
+    """
+    Answers every (source, target) pair with a pool of worker processes
+    and yields result dicts as they finish, or in input order if `ordered`.
+    With `names`, pairs hold person names rather than person_ids.
+    """
+    workers = workers or os.cpu_count()
+
+    # Build the snapshot (and landmarks) once up front so workers only have to read them
+    degrees.load_graph(directory)
+    if mode == "graph-astar":
+        degrees.load_landmarks(directory)
+
+    pending = {}
+    # Finished chunks held back until every earlier chunk is written
+    finished = {}
+    next_chunk = 0
+
+    def collect():
+        nonlocal next_chunk
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            finished[pending.pop(future)] = future.result()
+        if not ordered:
+            for number in list(finished):
+                yield from finished.pop(number)
+        while next_chunk in finished:
+            yield from finished.pop(next_chunk)
+            next_chunk += 1
+
+    with ProcessPoolExecutor(workers, initializer=init_worker,
+                             initargs=(directory, mode, names)) as pool:
+        for number, chunk in enumerate(chunks(pairs, chunk_size)):
+            pending[pool.submit(answer, chunk)] = number
+
+            # Keep a bounded number of chunks in flight for very long inputs
+            if len(pending) >= 4 * workers:
+                yield from collect()
+        while pending:
+            yield from collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees of separation queries as JSON lines."
+    )
+    parser.add_argument("directory", help="directory with people.csv, movies.csv and stars.csv")
+    parser.add_argument("queries", nargs="?", default="-",
+                        help="file of source/target person_id pairs, - for stdin")
+    parser.add_argument("--mode", default="graph-bidirectional",
+                        choices=sorted(degrees.graph_modes))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--ordered", action="store_true",
+                        help="write results in input order")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--names", action="store_true",
+                        help="queries give person names, matched with typo tolerance")
+    args = parser.parse_args()
+
+    f = sys.stdin if args.queries == "-" else open(args.queries, encoding="utf-8")
+    with f:
+        results = run(args.directory, read_pairs(f), args.mode,
+                      args.workers, args.ordered, args.chunk_size, args.names)
+        for result in results:
+            print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
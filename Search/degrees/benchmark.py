@@ -0,0 +1,156 @@
+import multiprocessing
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+import degrees
+import snapshot
+from graph import Graph
+
+
+def sample_pairs(count, seed=0):
+    """
+    Returns `count` random (source, target) pairs of person_ids.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    return [
+        (rng.choice(person_ids), rng.choice(person_ids))
+        for _ in range(count)
+    ]
+
+
+def compare_modes(pairs):
+    """
+    Runs every search mode on the same pairs and returns a dict mapping
+    each mode to its total number of expanded nodes and its list of
+    per-query latencies in seconds.
+
+    Raises an exception if two modes disagree on a path length.
+    """
+    results = {}
+    lengths = {}
+    for mode, search in degrees.search_modes.items():
+        stats = {"expanded": 0}
+        latencies = []
+        for pair in pairs:
+            start = time.perf_counter()
+            path = search(*pair, stats=stats)
+            latencies.append(time.perf_counter() - start)
+            length = None if path is None else len(path)
+            if lengths.setdefault(pair, length) != length:
+                raise Exception(f"{mode} found a different path length for {pair}")
+        results[mode] = {"expanded": stats["expanded"], "latencies": latencies}
+    return results
+
+
+def search_memory(pairs):
+    """
+    Returns a dict mapping each search mode to the largest amount of
+    memory, in MB, that one of its searches allocated at once.
+    """
+    peaks = {}
+    for mode, search in degrees.search_modes.items():
+        peak = 0
+        for pair in pairs:
+            tracemalloc.start()
+            search(*pair)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        peaks[mode] = peak / 2 ** 20
+    return peaks
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of a list of numbers.
+    """
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def load_dicts(directory):
+    degrees.load_data(directory)
+
+
+def load_csv_graph(directory):
+    Graph.from_csv(directory)
+
+
+def load_snapshot(directory):
+    snapshot.load(directory)
+
+
+def timed_load(loader, directory):
+    """
+    Runs one loader and returns (seconds, peak RSS in MB) of this process.
+    """
+    start = time.perf_counter()
+    loader(directory)
+    seconds = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux
+    return seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_loads(directory):
+    """
+    Times each way of loading the data in a fresh process, so that
+    every peak RSS only counts its own loader.
+    """
+    # Make sure a warm snapshot exists first
+    snapshot.load_or_build(directory)
+
+    loaders = {
+        "dicts": load_dicts,
+        "graph from csv": load_csv_graph,
+        "graph from snapshot": load_snapshot,
+    }
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for name, loader in loaders.items():
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(timed_load, (loader, directory))
+    return results
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [directory] [pairs]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else 100
+
+    print("Measuring loads...")
+    print(f"{'load':>20}  {'seconds':>10}  {'peak RSS MB':>12}")
+    for name, (seconds, rss) in measure_loads(directory).items():
+        print(f"{name:>20}  {seconds:>10.3f}  {rss:>12.1f}")
+    print()
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    degrees.load_graph(directory)
+    degrees.load_landmarks(directory)
+    print("Data loaded.")
+
+    pairs = sample_pairs(count)
+    results = compare_modes(pairs)
+
+    # tracemalloc slows searches down a lot, so only a few are traced
+    memory = search_memory(pairs[:10])
+
+    baseline = results["bfs"]["expanded"]
+    print(f"Search over {len(pairs)} pairs:")
+    print(f"{'mode':>20}  {'expanded':>12}  {'per query':>10}  {'vs bfs':>8}  {'p50 ms':>8}  {'p99 ms':>8}  {'peak MB':>8}")
+    for mode, result in results.items():
+        total = result["expanded"]
+        ratio = baseline / total if total else float("inf")
+        p50 = percentile(result["latencies"], 50) * 1000
+        p99 = percentile(result["latencies"], 99) * 1000
+        print(f"{mode:>20}  {total:>12}  {total / len(pairs):>10.1f}  {ratio:>7.1f}x  {p50:>8.3f}  {p99:>8.3f}  {memory[mode]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+
+class PathCache():
+    """
+    Remembers shortest paths between pairs of person_ids, dropping the
+    least recently used ones beyond `maxsize` (None for no limit).
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+
+        # Maps (source, target) to a list of (movie_id, person_id) pairs, or None,
+        # least recently used first
+        self.paths = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, pair):
+        return pair in self.paths
+
+    def lookup(self, source, target):
+        """
+        Returns (True, path) for a cached pair, or (False, None),
+        counting the hit or miss.
+        """
+        with self.lock:
+            pair = (source, target)
+            if pair in self.paths:
+                self.hits += 1
+                self.paths.move_to_end(pair)
+                return True, self.paths[pair]
+            self.misses += 1
+            return False, None
+
+    def put(self, source, target, path):
+        with self.lock:
+            self.paths[(source, target)] = path
+            self.paths.move_to_end((source, target))
+            if self.maxsize is not None and len(self.paths) > self.maxsize:
+                self.paths.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.paths.clear()
+
+    def stats(self):
+        """
+        Returns a dict of the cache's size and hit/miss counters.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.paths),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def invalidate(self, graph, edges, landmarks=None):
+        """
+        Drops the cached paths that new (person, movie) index edges could
+        shorten, and returns how many were dropped. Must be called with the
+        graph the edges were just ingested into and, if available, with
+        landmarks computed before the ingest.
+
+        A path made shorter has to use at least one new edge, so it runs
+        source -> a -> b -> target with a and b stars of a movie that gained
+        a star, and old edges only up to a and from b. It can only be shorter
+        than a cached path of length L if d(source, a) + 1 + d(b, target) < L,
+        which is ruled out whenever the landmark lower bounds say so.
+        """
+        # People now joined by a new edge
+        touched = set()
+        for _, movie in edges:
+            touched.update(graph.stars_of(movie))
+        if not touched:
+            return 0
+
+        # People ingested just now have no old edges, so an old path can
+        # only end at them if it is empty
+        size = len(landmarks.distances[0]) if landmarks and landmarks.distances else None
+        old = [person for person in touched if size is None or person < size]
+
+        # Per landmark, the sorted distances to the old touched people it
+        # reaches, and whether it misses any of them
+        profiles = []
+        if landmarks is not None:
+            for distance in landmarks.distances:
+                reached = sorted(distance[person] for person in old if distance[person] != -1)
+                profiles.append((distance, reached, len(reached) < len(old)))
+
+        def nearest(person_id):
+            """
+            Returns a lower bound on the old degrees between a person and
+            any touched person, or None if none of them can be reached.
+            """
+            person = graph.person_index(person_id)
+            if person in touched:
+                return 0
+            if not old or (size is not None and person >= size):
+                return None
+            bound = 0
+            for distance, reached, missed in profiles:
+                d = distance[person]
+                if d == -1:
+                    # only the touched people this landmark misses are candidates
+                    if not missed:
+                        return None
+                    continue
+                if not reached:
+                    return None
+                i = bisect_left(reached, d)
+                gaps = [abs(reached[j] - d) for j in (i - 1, i) if 0 <= j < len(reached)]
+                bound = max(bound, min(gaps))
+            return bound
+
+        with self.lock:
+            stale = []
+            for (source, target), path in self.paths.items():
+                a = nearest(source)
+                b = nearest(target)
+                if a is None or b is None:
+                    continue
+                if path is None or a + 1 + b < len(path):
+                    stale.append((source, target))
+
+            for pair in stale:
+                del self.paths[pair]
+        return len(stale)
+
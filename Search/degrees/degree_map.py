@@ -0,0 +1,76 @@
+import json
+import struct
+import sys
+from array import array
+
+import degrees
+from graph import degree_map, histogram
+
+MAGIC = b"DEGMAP01"
+
+
+def save(filename, source_id, distance, parent, via):
+    """
+    Write a degree map as a small JSON header followed by the raw
+    distance (int16), parent and via (int32) arrays, indexed by the
+    dense person index of the graph.
+    """
+    header = json.dumps({
+        "source": source_id,
+        "people": len(distance),
+    }).encode("utf-8")
+    with open(filename, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<q", len(header)))
+        f.write(header)
+        for values in (distance, parent, via):
+            f.write(values.tobytes())
+
+
+def load(filename):
+    """
+    Read a degree map written by save.
+    Returns (source_id, distance, parent, via).
+    """
+    with open(filename, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise Exception("not a degree map file")
+        (length,) = struct.unpack("<q", f.read(8))
+        header = json.loads(f.read(length))
+        arrays = []
+        for typecode in ("h", "i", "i"):
+            values = array(typecode)
+            values.fromfile(f, header["people"])
+            arrays.append(values)
+    return (header["source"], *arrays)
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python degree_map.py directory name [output]")
+    directory = sys.argv[1]
+
+    print("Loading data...")
+    degrees.load_graph(directory)
+    print("Data loaded.")
+
+    source = degrees.person_id_for_name(sys.argv[2])
+    if source is None:
+        sys.exit("Person not found.")
+    output = sys.argv[3] if len(sys.argv) == 4 else f"{source}.degrees"
+
+    graph = degrees.graph
+    distance, parent, via = degree_map(graph, graph.person_index(source))
+    save(output, source, distance, parent, via)
+    print(f"Degree map written to {output}.")
+
+    counts = histogram(distance)
+    name = degrees.person_name(source)
+    print(f"Degrees of separation from {name}:")
+    for d in sorted(key for key in counts if key is not None):
+        print(f"{d:>12}: {counts[d]}")
+    print(f"{'unreachable':>12}: {counts.get(None, 0)}")
+
+
+if __name__ == "__main__":
+    main()
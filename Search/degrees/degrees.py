@@ -1,6 +1,11 @@
 import csv
 import sys
 
+from cache import PathCache
+import graph as csr
+import landmarks as alt
+from names import NameIndex
+import snapshot
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,6 +17,18 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact CSR graph, used instead of the dicts above by the graph search modes
+graph = None
+
+# Landmark distances over the graph, used by the A* search mode
+landmarks = None
+
+# Shortest paths found so far over the graph
+path_cache = PathCache()
+
+# Prefix and fuzzy index over person names, built on first use
+name_index = None
+
 
 def load_data(directory):
     """
@@ -52,14 +69,105 @@ def load_data(directory):
                 pass
 
 
+def load_graph(directory):
+    """
+    Load data into the compact graph backend, from a snapshot of
+    an earlier load if the CSV files haven't changed since.
+    """
+    global graph
+    graph = snapshot.load_or_build(directory)
+
+
+def load_landmarks(directory):
+    """
+    Load landmark distances for the graph, computing them
+    if they are missing or out of date.
+    """
+    global landmarks
+    landmarks = alt.load_or_build(graph, directory)
+
+
+def ingest(new_people=(), new_movies=(), new_stars=()):
+    """
+    Adds (id, name, birth) people, (id, title, year) movies and
+    (person_id, movie_id) stars to the loaded graph without reloading it,
+    dropping only the cached paths the new stars could shorten. Without
+    a graph, they are added to the dicts of load_data instead.
+
+    Returns (people, movies, stars): the rows that were new, leaving out
+    known ids, known stars and stars of unknown people or movies.
+    """
+    global landmarks, name_index
+    if graph is None:
+        return ingest_data(new_people, new_movies, new_stars)
+
+    people_before = len(graph.person_ids)
+    added_people, added_movies, edges = graph.ingest(new_people, new_movies, new_stars)
+    if added_people:
+        name_index = None
+    path_cache.invalidate(graph, edges, landmarks)
+
+    # Landmark distances no longer bound the new graph's degrees,
+    # nor cover the people added to it
+    if edges or len(graph.person_ids) != people_before:
+        landmarks = None
+    added_stars = [(graph.person_ids[p], graph.movie_ids[m]) for p, m in edges]
+    return added_people, added_movies, added_stars
+
+
+def ingest_data(new_people=(), new_movies=(), new_stars=()):
+    """
+    Adds people, movies and stars to the dicts of load_data,
+    skipping the same rows as ingest, and returns the rows added.
+    """
+    global name_index
+    added_people = []
+    for person_id, name, birth in new_people:
+        if person_id not in people:
+            people[person_id] = {"name": name, "birth": birth, "movies": set()}
+            names.setdefault(name.lower(), set()).add(person_id)
+            added_people.append((person_id, name, birth))
+
+    added_movies = []
+    for movie_id, title, year in new_movies:
+        if movie_id not in movies:
+            movies[movie_id] = {"title": title, "year": year, "stars": set()}
+            added_movies.append((movie_id, title, year))
+
+    added_stars = []
+    for person_id, movie_id in new_stars:
+        if person_id not in people or movie_id not in movies:
+            continue
+        if movie_id in people[person_id]["movies"]:
+            continue
+        people[person_id]["movies"].add(movie_id)
+        movies[movie_id]["stars"].add(person_id)
+        added_stars.append((person_id, movie_id))
+
+    if added_people:
+        name_index = None
+    # Cached paths over the dicts can't be checked against the new stars
+    if added_stars:
+        path_cache.clear()
+    return added_people, added_movies, added_stars
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python degrees.py [directory] [mode]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    mode = sys.argv[2] if len(sys.argv) == 3 else "bfs"
+    if mode not in search_modes and mode != "all":
+        sys.exit(f"Unknown mode. Choose one of: {', '.join(search_modes)}, all")
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    if mode in graph_modes or mode == "all":
+        load_graph(directory)
+        if mode == "graph-astar":
+            load_landmarks(directory)
+    else:
+        load_data(directory)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,31 +177,52 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if mode == "all":
+        count = count_shortest_paths(source, target)
+        if count == 0:
+            print("Not connected.")
+            return
+        print(f"{count} shortest paths.")
+        for number, path in enumerate(all_shortest_paths(source, target), 1):
+            print(f"Path {number}:")
+            print_path(source, path)
+        return
+
+    path = search_modes[mode](source, target)
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
 
 
-def shortest_path(source, target):
+def print_path(source, path):
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = person_name(path[i][1])
+        person2 = person_name(path[i + 1][1])
+        movie = movie_title(path[i + 1][0])
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+    If a stats dict is given, the number of expanded nodes
+    is added to stats["expanded"].
     """
     if source == target:
         return []
 
+    if stats is None:
+        stats = {}
+    stats.setdefault("expanded", 0)
+
     frontier = QueueFrontier()
     explored = set()
 
@@ -112,73 +241,302 @@ def shortest_path(source, target):
 
         # add removed node to explored set
         explored.add(node.state)
+        stats["expanded"] += 1
 
-        neighbors = neighbors_for_person(node.state)
+        # loop trough neighbors, without building the whole set of them first
+        for movie_id in people[node.state]["movies"]:
+            for person_id in movies[movie_id]["stars"]:
 
-        # loop trough neighbors
-        for neighbor in neighbors:
+                # check if state has already been explored
+                if person_id in explored:
+                    continue
 
-            neighbor_node = Node(state=neighbor[1], parent=node, action=neighbor)
-            
-            # check if state has already been explored
-            if neighbor_node.state in explored:
-                continue
+                # check if node is already in frontier
+                if frontier.contains_state(person_id):
+                    continue
 
-            # check if node is already in frontier
-            if frontier.contains_state(neighbor_node):
-                continue
+                # only states that are kept get a node
+                neighbor_node = Node(state=person_id, parent=node, action=(movie_id, person_id))
 
-            if neighbor_node.state == target:
-                actions = []
+                if person_id == target:
+                    actions = []
                 
-                # loop from target node to initial node
-                while neighbor_node.parent is not None:
-                    actions.append(neighbor_node.action)
-                    neighbor_node = neighbor_node.parent
+                    # loop from target node to initial node
+                    while neighbor_node.parent is not None:
+                        actions.append(neighbor_node.action)
+                        neighbor_node = neighbor_node.parent
                 
-                actions.reverse()
-                # return list of actions
-                return actions
+                    actions.reverse()
+                    # return list of actions
+                    return actions
             
 
-            # add node to frontier if not in explored set nor already in frontier nor the target node    
-            frontier.add(neighbor_node)
+                # add node to frontier if not in explored set nor already in frontier nor the target node    
+                frontier.add(neighbor_node)
 
     
     raise Exception("No result found")
 
 
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one breadth-first
+    frontier from each end and joining them where they meet.
+
+    If no possible path, returns None.
+    If a stats dict is given, the number of expanded nodes
+    is added to stats["expanded"].
+    """
+    if source == target:
+        return []
+
+    if stats is None:
+        stats = {}
+    stats.setdefault("expanded", 0)
+
+    # Maps reached person_ids to (parent person_id, movie_id), one map per end
+    forward = {source: None}
+    backward = {target: None}
+
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # always grow the smaller layer, it is the cheaper one to expand
+        if len(forward_layer) <= len(backward_layer):
+            layer, reached, other = forward_layer, forward, backward
+        else:
+            layer, reached, other = backward_layer, backward, forward
+
+        next_layer = []
+        for person_id in layer:
+            stats["expanded"] += 1
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor in reached:
+                    continue
+                reached[neighbor] = (person_id, movie_id)
+
+                # the reached maps were disjoint before this layer,
+                # so the first meeting person lies on a shortest path
+                if neighbor in other:
+                    return join_paths(forward, backward, neighbor)
+
+                next_layer.append(neighbor)
+
+        if reached is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Rebuilds the list of (movie_id, person_id) pairs running through
+    the meeting person from the parent maps of a bidirectional search.
+    """
+    path = []
+
+    # walk back from the meeting person to the source
+    person_id = meeting
+    while forward[person_id] is not None:
+        parent, movie_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    # walk on from the meeting person to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        parent, movie_id = backward[person_id]
+        path.append((movie_id, parent))
+        person_id = parent
+
+    return path
+
+
+def graph_search(search):
+    """
+    Wraps a search over the compact graph so it takes and returns
+    the original person_ids and movie_ids.
+    """
+    def wrapper(source, target, stats=None):
+        path = search(graph, graph.person_index(source), graph.person_index(target), stats)
+        return graph.translate(path)
+    return wrapper
+
+
+def astar_shortest_path(graph, source, target, stats=None):
+    """
+    A* search over the graph, bounded by the loaded landmarks.
+    Falls back to breadth-first search without them.
+    """
+    if landmarks is None:
+        return csr.shortest_path(graph, source, target, stats)
+    return alt.shortest_path(graph, landmarks, source, target, stats)
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest path between two person_ids over the loaded
+    graph, as lists of (movie_id, person_id) pairs. Paths are built one
+    at a time, so callers can stop early when there are very many.
+    """
+    paths = csr.all_shortest_paths(graph, graph.person_index(source), graph.person_index(target))
+    for path in paths:
+        yield graph.translate(path)
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns how many shortest paths join two person_ids over the
+    loaded graph, without listing them.
+    """
+    return csr.count_shortest_paths(graph, graph.person_index(source), graph.person_index(target))
+
+
+def find_path(source, target, mode="graph-bidirectional"):
+    """
+    Returns the shortest path between two person_ids over the
+    loaded graph, reusing earlier answers from the path cache.
+    """
+    found, path = path_cache.lookup(source, target)
+    if found:
+        return path
+    path = search_modes[mode](source, target)
+    path_cache.put(source, target, path)
+    return path
+
+
+# Search modes selectable from the command line
+search_modes = {
+    "bfs": shortest_path,
+    "bidirectional": bidirectional_shortest_path,
+    "graph-bfs": graph_search(csr.shortest_path),
+    "graph-bidirectional": graph_search(csr.bidirectional_shortest_path),
+    "graph-astar": graph_search(astar_shortest_path),
+}
+
+# Search modes that run over the compact graph instead of the dicts
+graph_modes = {"graph-bfs", "graph-bidirectional", "graph-astar"}
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
-        return None
+        person_ids = similar_person_ids(name)
+        if len(person_ids) == 0:
+            return None
+        print(f"No '{name}' found. Did you mean:")
+        return choose_person(person_ids)
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
+        return choose_person(person_ids)
     else:
         return person_ids[0]
 
 
+def choose_person(person_ids):
+    """
+    Lists the given people and asks which one is meant.
+    """
+    for person_id in person_ids:
+        name = person_name(person_id)
+        birth = person_birth(person_id)
+        print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+    try:
+        person_id = input("Intended Person ID: ")
+        if person_id in person_ids:
+            return person_id
+    except ValueError:
+        pass
+    return None
+
+
+def person_ids_for_name(name):
+    """
+    Returns the list of person_ids with the given name, ignoring case.
+    """
+    if graph is not None and not people:
+        return [graph.person_ids[p] for p in graph.people_named(name)]
+    return list(names.get(name.lower(), set()))
+
+
+def names_index():
+    """
+    Returns the name index over the loaded people, building it on first use.
+    """
+    global name_index
+    if name_index is None:
+        if graph is not None and not people:
+            name_index = NameIndex.from_graph(graph)
+        else:
+            name_index = NameIndex(names)
+    return name_index
+
+
+def similar_person_ids(name, limit=5):
+    """
+    Returns the person_ids of the names closest to `name`, best first.
+    """
+    return [
+        person_id
+        for _, person_ids in names_index().search(name, limit)
+        for person_id in person_ids
+    ]
+
+
+def resolve_name(name):
+    """
+    Returns the person_id of the best match for a name without asking,
+    or None if nothing is close.
+    """
+    person_ids = person_ids_for_name(name) or similar_person_ids(name, limit=1)
+    return person_ids[0] if person_ids else None
+
+
+def person_name(person_id):
+    """
+    Returns the name of a person.
+    """
+    if graph is not None and not people:
+        return graph.person_names[graph.person_index(person_id)]
+    return people[person_id]["name"]
+
+
+def person_birth(person_id):
+    """
+    Returns the birth year of a person.
+    """
+    if graph is not None and not people:
+        return graph.person_births[graph.person_index(person_id)]
+    return people[person_id]["birth"]
+
+
+def movie_title(movie_id):
+    """
+    Returns the title of a movie.
+    """
+    if graph is not None and not people:
+        return graph.movie_titles[graph.movie_index(movie_id)]
+    return movies[movie_id]["title"]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None and not people:
+        return set(graph.translate(graph.neighbors(graph.person_index(person_id))))
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,101 @@
+import argparse
+import csv
+import os
+import random
+
+FIRST_NAMES = [
+    "Anna", "Ben", "Carla", "David", "Emma", "Frank", "Grace", "Henry", "Iris",
+    "Jack", "Kate", "Leo", "Maria", "Nick", "Olivia", "Paul", "Quinn", "Rosa",
+    "Sam", "Tina", "Uma", "Victor", "Wendy", "Xavier", "Yara", "Zoe",
+]
+
+SYLLABLES = [
+    "ba", "ker", "son", "mil", "ton", "ro", "berg", "wood", "lin", "man",
+    "da", "vis", "gar", "cia", "ste", "wart", "ham", "mond", "ley", "ford",
+]
+
+
+def surname(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def cast_size(rng, alpha, largest):
+    """
+    Draws a cast size from a power law, so most movies have a handful
+    of stars and a few have very large casts.
+    """
+    return min(largest, int(rng.paretovariate(alpha)))
+
+
+def pick_star(rng, people):
+    """
+    Picks a person for a cast: half the time anyone, otherwise a person
+    drawn from a power law over the low ids, which become the hubs.
+    """
+    if rng.random() < 0.5:
+        return rng.randrange(people)
+    return min(people, int(rng.paretovariate(0.6))) - 1
+
+
+def generate(directory, edges, people=None, alpha=1.5, largest=500, seed=0):
+    """
+    Write people.csv, movies.csv and stars.csv with about `edges` star rows.
+
+    Cast sizes follow a power law, and stars are drawn with a power-law
+    bias too, so a few people are in many movies like real hub actors.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    people = people or max(2, edges // 4)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(people):
+            name = f"{rng.choice(FIRST_NAMES)} {surname(rng)}"
+            writer.writerow([person + 1, name, rng.randint(1900, 2010)])
+
+    movies = 0
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        written = 0
+        while written < edges:
+            movies += 1
+            size = min(cast_size(rng, alpha, largest), edges - written)
+            cast = set()
+            while len(cast) < min(size, people):
+                cast.add(pick_star(rng, people))
+            for person in cast:
+                writer.writerow([person + 1, movies])
+            written += len(cast)
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie in range(movies):
+            title = f"The {surname(rng)} {rng.choice(['Story', 'Affair', 'Returns', 'Code', 'Run'])}"
+            writer.writerow([movie + 1, title, rng.randint(1920, 2024)])
+
+    return people, movies
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic IMDB-like degrees dataset."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--edges", type=int, default=100000,
+                        help="number of star rows, e.g. 10000 to 10000000")
+    parser.add_argument("--people", type=int, help="number of people (default: edges / 4)")
+    parser.add_argument("--alpha", type=float, default=1.5,
+                        help="power-law exponent of cast sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    people, movies = generate(args.directory, args.edges, args.people, args.alpha, seed=args.seed)
+    print(f"Wrote {people} people, {movies} movies and about {args.edges} stars to {args.directory}.")
+
+
+if __name__ == "__main__":
+    main()
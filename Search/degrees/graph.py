@@ -0,0 +1,589 @@
+import csv
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+
+class Graph():
+    """
+    Compact co-star graph.
+
+    People and movies are mapped to dense ints, their rank in the sorted
+    list of ids. Adjacency is stored in CSR form: the movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]], and the stars of
+    movie m are movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+
+    People, movies and stars added by ingest are kept in a small overlay
+    on top of the CSR arrays until the graph is compacted: new ids get the
+    next free indices and new edges live in per-node lists.
+    """
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_names, person_births, movie_titles, movie_years,
+                 name_order):
+        self.person_ids = Column(person_ids)
+        self.movie_ids = Column(movie_ids)
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.person_names = Column(person_names)
+        self.person_births = Column(person_births)
+        self.movie_titles = Column(movie_titles)
+        self.movie_years = Column(movie_years)
+
+        # Person indices sorted by lowercase name
+        self.name_order = name_order
+
+        # Ingested ids, mapped to their indices
+        self.added_people = {}
+        self.added_movies = {}
+
+        # Ingested edges, by person and by movie index
+        self.added_person_movies = {}
+        self.added_movie_people = {}
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Load a graph from the people, movies and stars CSV files.
+        """
+        people = read_rows(f"{directory}/people.csv", ("id", "name", "birth"))
+        movies = read_rows(f"{directory}/movies.csv", ("id", "title", "year"))
+        person_ids, person_names, person_births = people
+        movie_ids, movie_titles, movie_years = movies
+
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        # Encode every (person, movie) edge as one int, dropping duplicates
+        edges = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    p = person_index[row["person_id"]]
+                    m = movie_index[row["movie_id"]]
+                except KeyError:
+                    continue
+                edges.add(p * len(movie_ids) + m)
+
+        return cls.from_edges(
+            person_ids, movie_ids, sorted(edges),
+            person_names, person_births, movie_titles, movie_years
+        )
+
+    @classmethod
+    def from_edges(cls, person_ids, movie_ids, edges,
+                   person_names, person_births, movie_titles, movie_years):
+        """
+        Build a graph from sorted, encoded person * len(movie_ids) + movie edges.
+        """
+        movie_count = len(movie_ids)
+
+        # Edges are sorted by person, so person_movies falls out in order
+        person_offsets = array("q", bytes(8 * (len(person_ids) + 1)))
+        person_movies = array("i", bytes(4 * len(edges)))
+        movie_offsets = array("q", bytes(8 * (movie_count + 1)))
+        for i, edge in enumerate(edges):
+            p, m = divmod(edge, movie_count)
+            person_offsets[p + 1] += 1
+            movie_offsets[m + 1] += 1
+            person_movies[i] = m
+        for i in range(len(person_ids)):
+            person_offsets[i + 1] += person_offsets[i]
+        for i in range(movie_count):
+            movie_offsets[i + 1] += movie_offsets[i]
+
+        # Counting sort by movie for the other direction
+        movie_people = array("i", bytes(4 * len(edges)))
+        fill = array("q", movie_offsets[:-1])
+        for p in range(len(person_ids)):
+            for i in range(person_offsets[p], person_offsets[p + 1]):
+                m = person_movies[i]
+                movie_people[fill[m]] = p
+                fill[m] += 1
+
+        name_order = array("i", sorted(
+            range(len(person_ids)), key=lambda p: person_names[p].lower()
+        ))
+
+        return cls(
+            person_ids, movie_ids,
+            person_offsets, person_movies, movie_offsets, movie_people,
+            person_names, person_births, movie_titles, movie_years,
+            name_order
+        )
+
+    def person_index(self, person_id):
+        """
+        Returns the dense index of a person_id, or None if unknown.
+        """
+        i = find(self.person_ids.base, person_id)
+        return self.added_people.get(person_id) if i is None else i
+
+    def movie_index(self, movie_id):
+        """
+        Returns the dense index of a movie_id, or None if unknown.
+        """
+        i = find(self.movie_ids.base, movie_id)
+        return self.added_movies.get(movie_id) if i is None else i
+
+    def people_named(self, name):
+        """
+        Returns the indices of all people whose lowercase name is `name`.
+        """
+        name = name.lower()
+        key = lambda p: self.person_names[p].lower()
+        start = bisect_left(self.name_order, name, key=key)
+        end = bisect_right(self.name_order, name, lo=start, key=key)
+        found = list(self.name_order[start:end])
+        for p in self.added_people.values():
+            if self.person_names[p].lower() == name:
+                found.append(p)
+        return found
+
+    def movies_of(self, person):
+        """
+        Returns the movie indices a person starred in.
+        """
+        if person >= len(self.person_ids.base):
+            return self.added_person_movies.get(person, [])
+        movies = self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+        if person in self.added_person_movies:
+            return list(movies) + self.added_person_movies[person]
+        return movies
+
+    def stars_of(self, movie):
+        """
+        Returns the person indices of the stars of a movie.
+        """
+        if movie >= len(self.movie_ids.base):
+            return self.added_movie_people.get(movie, [])
+        stars = self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+        if movie in self.added_movie_people:
+            return list(stars) + self.added_movie_people[movie]
+        return stars
+
+    def neighbors(self, person):
+        """
+        Returns (movie, person) index pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for movie in self.movies_of(person):
+            for star in self.stars_of(movie):
+                neighbors.add((movie, star))
+        return neighbors
+
+    def ingest(self, people=(), movies=(), stars=()):
+        """
+        Adds (id, name, birth) people, (id, title, year) movies and
+        (person_id, movie_id) stars to the graph in place, skipping ids and
+        edges it already has and stars of unknown people or movies.
+
+        Returns (people, movies, edges): the people and movie rows that
+        were added and the list of (person, movie) index edges that were.
+        """
+        added_people = []
+        for person_id, name, birth in people:
+            if self.person_index(person_id) is None:
+                self.added_people[person_id] = len(self.person_ids)
+                self.person_ids.append(person_id)
+                self.person_names.append(name)
+                self.person_births.append(birth)
+                added_people.append((person_id, name, birth))
+
+        added_movies = []
+        for movie_id, title, year in movies:
+            if self.movie_index(movie_id) is None:
+                self.added_movies[movie_id] = len(self.movie_ids)
+                self.movie_ids.append(movie_id)
+                self.movie_titles.append(title)
+                self.movie_years.append(year)
+                added_movies.append((movie_id, title, year))
+
+        added = []
+        for person_id, movie_id in stars:
+            person = self.person_index(person_id)
+            movie = self.movie_index(movie_id)
+            if person is None or movie is None or movie in self.movies_of(person):
+                continue
+            self.added_person_movies.setdefault(person, []).append(movie)
+            self.added_movie_people.setdefault(movie, []).append(person)
+            added.append((person, movie))
+        return added_people, added_movies, added
+
+    def ingested(self):
+        """
+        Returns True if anything was ingested since the graph was built.
+        """
+        return bool(self.added_people or self.added_movies or self.added_person_movies)
+
+    def compact(self):
+        """
+        Returns a new graph with everything ingested merged into
+        the CSR arrays, with indices renumbered in id order again.
+        """
+        people = sorted(zip(self.person_ids, self.person_names, self.person_births))
+        movies = sorted(zip(self.movie_ids, self.movie_titles, self.movie_years))
+        person_ids, person_names, person_births = map(list, zip(*people)) if people else ([], [], [])
+        movie_ids, movie_titles, movie_years = map(list, zip(*movies)) if movies else ([], [], [])
+
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = array("i", bytes(4 * len(movie_ids)))
+        for i, movie_id in enumerate(movie_ids):
+            movie_index[self.movie_index(movie_id)] = i
+
+        edges = []
+        for person in range(len(self.person_ids)):
+            p = person_index[self.person_ids[person]] * len(movie_ids)
+            for movie in self.movies_of(person):
+                edges.append(p + movie_index[movie])
+        edges.sort()
+
+        return Graph.from_edges(
+            person_ids, movie_ids, edges,
+            person_names, person_births, movie_titles, movie_years
+        )
+
+    def translate(self, path):
+        """
+        Maps a list of (movie, person) index pairs back to
+        (movie_id, person_id) pairs.
+        """
+        if path is None:
+            return None
+        return [
+            (self.movie_ids[movie], self.person_ids[person])
+            for movie, person in path
+        ]
+
+
+class Column():
+    """
+    Sequence of values from when the graph was built,
+    followed by values ingested since.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.added = []
+
+    def __len__(self):
+        return len(self.base) + len(self.added)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if 0 <= i < len(self.base):
+            return self.base[i]
+        if i < 0:
+            return self[i + len(self)]
+        return self.added[i - len(self.base)]
+
+    def __iter__(self):
+        yield from self.base
+        yield from self.added
+
+    def append(self, value):
+        self.added.append(value)
+
+
+def read_rows(filename, fields):
+    """
+    Returns one list per field of a CSV file, with rows sorted by the first field.
+    """
+    with open(filename, encoding="utf-8") as f:
+        rows = sorted({
+            row[fields[0]]: tuple(row[field] for field in fields)
+            for row in csv.DictReader(f)
+        }.values())
+    return tuple(list(column) for column in zip(*rows)) or tuple([] for _ in fields)
+
+
+def find(ids, item):
+    """
+    Returns the position of `item` in the sorted sequence `ids`, or None.
+    """
+    i = bisect_left(ids, item)
+    if i < len(ids) and ids[i] == item:
+        return i
+    return None
+
+
+def shortest_path(graph, source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source to the target.
+
+    Each movie's cast is scanned at most once, the first time one of its
+    stars is expanded, since later visits can't reach anyone sooner.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    if stats is None:
+        stats = {}
+    stats.setdefault("expanded", 0)
+
+    movies_of, stars_of = graph.movies_of, graph.stars_of
+
+    # parent[p] is the person p was reached from, via movie via[p]
+    parent = array("i", [-1]) * len(graph.person_ids)
+    via = array("i", [-1]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    parent[source] = source
+
+    frontier = deque([source])
+    while frontier:
+        person = frontier.popleft()
+        stats["expanded"] += 1
+        for movie in movies_of(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for neighbor in stars_of(movie):
+                if parent[neighbor] != -1:
+                    continue
+                parent[neighbor] = person
+                via[neighbor] = movie
+                if neighbor == target:
+                    return walk(parent, via, source, target)
+                frontier.append(neighbor)
+
+    return None
+
+
+def bidirectional_shortest_path(graph, source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) index pairs that connect
+    the source to the target, growing one breadth-first frontier from
+    each end and joining them where they meet.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    if stats is None:
+        stats = {}
+    stats.setdefault("expanded", 0)
+
+    movies_of, stars_of = graph.movies_of, graph.stars_of
+
+    sides = []
+    for start in (source, target):
+        parent = array("i", [-1]) * len(graph.person_ids)
+        parent[start] = start
+        sides.append({
+            "parent": parent,
+            "via": array("i", [-1]) * len(graph.person_ids),
+            "seen_movies": bytearray(len(graph.movie_ids)),
+            "layer": [start],
+        })
+    forward, backward = sides
+
+    while forward["layer"] and backward["layer"]:
+
+        # always grow the smaller layer, it is the cheaper one to expand
+        if len(forward["layer"]) <= len(backward["layer"]):
+            side, other = forward, backward
+        else:
+            side, other = backward, forward
+        parent, via, seen_movies = side["parent"], side["via"], side["seen_movies"]
+        other_parent = other["parent"]
+
+        next_layer = []
+        for person in side["layer"]:
+            stats["expanded"] += 1
+            for movie in movies_of(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for neighbor in stars_of(movie):
+                    if parent[neighbor] != -1:
+                        continue
+                    parent[neighbor] = person
+                    via[neighbor] = movie
+
+                    # the reached sets were disjoint before this layer,
+                    # so the first meeting person lies on a shortest path
+                    if other_parent[neighbor] != -1:
+                        path = walk(forward["parent"], forward["via"], source, neighbor)
+                        person = neighbor
+                        while person != target:
+                            movie = backward["via"][person]
+                            person = backward["parent"][person]
+                            path.append((movie, person))
+                        return path
+
+                    next_layer.append(neighbor)
+        side["layer"] = next_layer
+
+    return None
+
+
+def shortest_path_dag(graph, source, target):
+    """
+    Runs a breadth-first search from the source that keeps every way of
+    reaching each person at its shortest depth, up to the target's depth.
+
+    Returns (person_parents, movie_parents): person_parents[p] lists the
+    movies p was reached through and movie_parents[m] lists the people
+    one level up who starred in m. Returns None if there is no path.
+    """
+    movies_of, stars_of = graph.movies_of, graph.stars_of
+
+    depth = {source: 0}
+    person_parents = {source: []}
+    movie_parents = {}
+
+    layer = [source]
+    level = 0
+    while layer and target not in depth:
+        next_layer = []
+        for person in layer:
+            for movie in movies_of(person):
+                if movie in movie_parents:
+                    continue
+
+                # A movie first met at this level joins every star at
+                # this level to every star not reached before
+                stars = stars_of(movie)
+                movie_parents[movie] = [star for star in stars if depth.get(star) == level]
+                for star in stars:
+                    if star not in depth:
+                        depth[star] = level + 1
+                        person_parents[star] = []
+                        next_layer.append(star)
+                    if depth[star] == level + 1:
+                        person_parents[star].append(movie)
+        layer = next_layer
+        level += 1
+
+    if target not in depth:
+        return None
+    return person_parents, movie_parents
+
+
+def all_shortest_paths(graph, source, target):
+    """
+    Yields every shortest list of (movie, person) index pairs that
+    connect the source to the target, one at a time.
+    """
+    dag = shortest_path_dag(graph, source, target)
+    if dag is None:
+        return
+    person_parents, movie_parents = dag
+
+    def paths_to(person):
+        if person == source:
+            yield []
+            return
+        for movie in person_parents[person]:
+            for parent in movie_parents[movie]:
+                for path in paths_to(parent):
+                    yield path + [(movie, person)]
+
+    yield from paths_to(target)
+
+
+def count_shortest_paths(graph, source, target):
+    """
+    Returns the number of shortest paths between the source and the
+    target without listing them, or 0 if they are not connected.
+    """
+    dag = shortest_path_dag(graph, source, target)
+    if dag is None:
+        return 0
+    person_parents, movie_parents = dag
+
+    # Count level by level from the source, each person's count is the
+    # sum over its parent movies of the counts of their parents
+    counts = {source: 1}
+
+    def count(person):
+        if person not in counts:
+            counts[person] = sum(
+                count(parent)
+                for movie in person_parents[person]
+                for parent in movie_parents[movie]
+            )
+        return counts[person]
+
+    return count(target)
+
+
+def degree_map(graph, source):
+    """
+    Runs one breadth-first pass from the source over the whole graph.
+
+    Returns (distance, parent, via) arrays: distance[p] is the number of
+    degrees between the source and p, -1 if p can't be reached, and p was
+    reached from person parent[p] through movie via[p].
+    """
+    movies_of, stars_of = graph.movies_of, graph.stars_of
+
+    distance = array("h", [-1]) * len(graph.person_ids)
+    parent = array("i", [-1]) * len(graph.person_ids)
+    via = array("i", [-1]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distance[source] = 0
+    parent[source] = source
+
+    # Expand one whole level at a time
+    layer = [source]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for movie in movies_of(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for neighbor in stars_of(movie):
+                    if distance[neighbor] == -1:
+                        distance[neighbor] = depth
+                        parent[neighbor] = person
+                        via[neighbor] = movie
+                        next_layer.append(neighbor)
+        layer = next_layer
+
+    return distance, parent, via
+
+
+def distances_from(graph, source):
+    """
+    Returns an array with the number of degrees between the source
+    and every person, -1 for people who can't be reached.
+    """
+    return degree_map(graph, source)[0]
+
+
+def histogram(distance):
+    """
+    Returns a dict mapping each number of degrees to how many people are
+    that far away, with unreachable people counted under None.
+    """
+    counts = {}
+    for d in distance:
+        key = None if d == -1 else d
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def walk(parent, via, source, person):
+    """
+    Returns the (movie, person) index pairs leading from source to person.
+    """
+    path = []
+    while person != source:
+        path.append((via[person], person))
+        person = parent[person]
+    path.reverse()
+    return path
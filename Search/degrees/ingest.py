@@ -0,0 +1,66 @@
+import csv
+import os
+import sys
+import time
+
+import degrees
+import snapshot
+
+
+def read_delta(directory, filename, fields):
+    """
+    Returns the rows of a delta CSV file as tuples of `fields`,
+    or no rows if the file doesn't exist.
+    """
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [tuple(row[field] for field in fields) for row in csv.DictReader(f)]
+
+
+def append_rows(directory, filename, fields, rows):
+    """
+    Appends rows to one of the base CSV files.
+    """
+    if not rows:
+        return
+    with open(os.path.join(directory, filename), "a", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        for row in rows:
+            writer.writerow(row)
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python ingest.py directory delta_directory")
+    directory, delta = sys.argv[1], sys.argv[2]
+
+    new_people = read_delta(delta, "people.csv", ("id", "name", "birth"))
+    new_movies = read_delta(delta, "movies.csv", ("id", "title", "year"))
+    new_stars = read_delta(delta, "stars.csv", ("person_id", "movie_id"))
+
+    print("Loading data...")
+    degrees.load_graph(directory)
+    print("Data loaded.")
+
+    start = time.perf_counter()
+    added_people, added_movies, added_stars = degrees.ingest(new_people, new_movies, new_stars)
+    print(f"Ingested {len(added_stars)} new stars in {time.perf_counter() - start:.3f}s.")
+
+    # Keep the CSV files the source of truth, then snapshot the merged graph.
+    # Only rows the graph took are appended, so a rebuild from the CSV files
+    # gives the same graph as the snapshot.
+    append_rows(directory, "people.csv", ("id", "name", "birth"), added_people)
+    append_rows(directory, "movies.csv", ("id", "title", "year"), added_movies)
+    append_rows(directory, "stars.csv", ("person_id", "movie_id"), added_stars)
+
+    if not (added_people or added_movies or added_stars):
+        return
+    start = time.perf_counter()
+    snapshot.save(degrees.graph, directory)
+    print(f"Snapshot written in {time.perf_counter() - start:.3f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import heapq
+import json
+import os
+import struct
+import sys
+from array import array
+
+from graph import distances_from, walk
+import snapshot
+
+MAGIC = b"LANDMRK1"
+
+# Name of the landmark file, written next to the CSV files
+FILENAME = "landmarks.bin"
+
+
+class Landmarks():
+    """
+    Distances from a few landmark people to everyone in a graph.
+
+    Since degrees of separation obey the triangle inequality,
+    |d(L, t) - d(L, v)| <= d(v, t) for any landmark L, which gives
+    A* a lower bound on the distance left from v to t.
+    """
+
+    def __init__(self, people, distances):
+        # Person indices of the landmarks
+        self.people = people
+
+        # distances[i][p] is the degrees from landmark i to person p, -1 if unreachable
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, k=16):
+        """
+        Pick `k` landmarks spread across the graph and compute their distances.
+
+        The first landmark is the person in the most movies, every next one
+        is the person furthest from all landmarks picked so far.
+        """
+        person_count = len(graph.person_ids)
+        if person_count == 0:
+            return cls([], [])
+
+        degree = lambda p: len(graph.movies_of(p))
+        first = max(range(person_count), key=degree)
+
+        people = [first]
+        distances = [distances_from(graph, first)]
+
+        # nearest[p] is the distance from p to its closest landmark so far
+        nearest = array("h", distances[0])
+        while len(people) < min(k, person_count):
+            unreached = [p for p in range(person_count) if nearest[p] == -1]
+            if unreached:
+                # a new component, which no landmark covers yet
+                landmark = max(unreached, key=degree)
+            else:
+                landmark = max(range(person_count), key=lambda p: nearest[p])
+                if nearest[landmark] == 0:
+                    break
+            people.append(landmark)
+            distances.append(distances_from(graph, landmark))
+            for p, d in enumerate(distances[-1]):
+                if d != -1 and (nearest[p] == -1 or d < nearest[p]):
+                    nearest[p] = d
+
+        return cls(people, distances)
+
+    def lower_bound(self, person, target):
+        """
+        Returns a lower bound on the degrees between two people,
+        or None if they are known not to be connected.
+        """
+        bound = 0
+        for distance in self.distances:
+            a, b = distance[person], distance[target]
+            if (a == -1) != (b == -1):
+                return None
+            if a != -1:
+                bound = max(bound, abs(a - b))
+        return bound
+
+
+def save(landmarks, directory, filename=None):
+    """
+    Write landmark distances to a file, tagged with the fingerprint
+    of the CSV files they were computed from.
+    """
+    filename = filename or os.path.join(directory, FILENAME)
+    header = json.dumps({
+        "sources": snapshot.fingerprint(directory),
+        "people": landmarks.people,
+    }).encode("utf-8")
+
+    temporary = f"{filename}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<q", len(header)))
+        f.write(header)
+        for distance in landmarks.distances:
+            f.write(distance.tobytes())
+    os.replace(temporary, filename)
+
+
+def load(graph, directory, filename=None):
+    """
+    Read landmark distances from a file, or return None if it is
+    missing or older than the CSV files.
+    """
+    filename = filename or os.path.join(directory, FILENAME)
+    try:
+        with open(filename, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = struct.unpack("<q", f.read(8))
+            header = json.loads(f.read(length))
+            if header["sources"] != snapshot.fingerprint(directory):
+                return None
+            distances = []
+            for _ in header["people"]:
+                distance = array("h")
+                distance.fromfile(f, len(graph.person_ids))
+                distances.append(distance)
+    except (OSError, EOFError, ValueError, struct.error):
+        return None
+    return Landmarks(header["people"], distances)
+
+
+def load_or_build(graph, directory, k=16):
+    """
+    Returns the landmarks for a directory, computing and saving
+    them if there is no up to date landmark file.
+    """
+    landmarks = load(graph, directory)
+    if landmarks is not None:
+        return landmarks
+
+    landmarks = Landmarks.build(graph, k)
+    try:
+        save(landmarks, directory)
+    except OSError:
+        pass
+    return landmarks
+
+
+def shortest_path(graph, landmarks, source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) index pairs that
+    connect the source to the target, using A* guided by landmark bounds.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    if stats is None:
+        stats = {}
+    stats.setdefault("expanded", 0)
+
+    movies_of, stars_of = graph.movies_of, graph.stars_of
+
+    # Distances from each landmark to the target, for the heuristic
+    ends = [
+        (distance, distance[target]) for distance in landmarks.distances
+        if distance[target] != -1
+    ]
+    if landmarks.lower_bound(source, target) is None:
+        return None
+
+    # Everyone but the target is at least one degree away from it,
+    # which keeps the bound consistent and lets the search stop as
+    # soon as the target is reached rather than when it is expanded
+    def heuristic(person):
+        return max((abs(end - distance[person]) for distance, end in ends), default=1) or 1
+
+    cost = {source: 0}
+    parent = {source: source}
+    via = {}
+
+    # Lowest degrees at which each movie's cast has been scanned
+    scanned = {}
+
+    # Ties on f are broken towards deeper nodes, which are closer to the target
+    frontier = [(heuristic(source), 0, source)]
+    closed = set()
+    while frontier:
+        _, negative_cost, person = heapq.heappop(frontier)
+        if person in closed:
+            continue
+        closed.add(person)
+        stats["expanded"] += 1
+
+        g = -negative_cost + 1
+        for movie in movies_of(person):
+            if scanned.get(movie, g + 1) <= g:
+                continue
+            scanned[movie] = g
+            for neighbor in stars_of(movie):
+                if neighbor in closed or cost.get(neighbor, g + 1) <= g:
+                    continue
+                cost[neighbor] = g
+                parent[neighbor] = person
+                via[neighbor] = movie
+                if neighbor == target:
+                    return walk(parent, via, source, target)
+                heapq.heappush(frontier, (g + heuristic(neighbor), -g, neighbor))
+
+    return None
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python landmarks.py directory [k]")
+    directory = sys.argv[1]
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+
+    print("Loading data...")
+    graph = snapshot.load_or_build(directory)
+    print("Data loaded.")
+
+    print(f"Computing {k} landmarks...")
+    landmarks = Landmarks.build(graph, k)
+    save(landmarks, directory)
+    names = [graph.person_names[p] for p in landmarks.people]
+    print(f"Saved {len(names)} landmarks to {os.path.join(directory, FILENAME)}: {', '.join(names)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# Rough number of postings a fuzzy search reads beyond the minimum it needs
+POSTINGS_BUDGET = 20000
+
+
+class NameIndex():
+    """
+    Index over lowercase person names for exact, prefix and fuzzy lookups.
+
+    Distinct names are kept in a sorted list for prefix ranges, and every
+    name is filed under each of its character trigrams together with the
+    trigram's position, for edit distance lookups.
+    """
+
+    def __init__(self, names):
+        """
+        `names` maps lowercase names to collections of person_ids.
+        """
+        # Distinct names in sorted order, and the person_ids for each
+        self.names = sorted(names)
+        self.people = [sorted(names[name]) for name in self.names]
+
+        # Maps each (trigram, position) to the indices of the names with it
+        grams = {}
+        for i, name in enumerate(self.names):
+            for key in enumerate(trigrams(name)):
+                grams.setdefault(key, []).append(i)
+        self.grams = {key: array("i", postings) for key, postings in grams.items()}
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Build the index for the people of a compact graph.
+        """
+        names = {}
+        for person, name in enumerate(graph.person_names):
+            names.setdefault(name.lower(), []).append(graph.person_ids[person])
+        return cls(names)
+
+    def exact(self, name):
+        """
+        Returns the person_ids with exactly this name, ignoring case.
+        """
+        name = name.lower()
+        i = bisect_left(self.names, name)
+        if i < len(self.names) and self.names[i] == name:
+            return self.people[i]
+        return []
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` names starting with `prefix`, in sorted order.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.names, prefix)
+        found = []
+        for name in self.names[start:start + limit]:
+            if not name.startswith(prefix):
+                break
+            found.append(name)
+        return found
+
+    def search(self, query, limit=10, max_distance=2):
+        """
+        Returns up to `limit` (name, person_ids) candidates for a query,
+        best first: names within `max_distance` edits ranked by distance,
+        then names that merely start with the query. Ties go to names
+        shared by more people.
+        """
+        query = query.lower()
+
+        # Looser searches read far more postings, so only widen
+        # the search while nothing closer has been found
+        scores = {}
+        for distance in range(1, max_distance + 1):
+            scores = self.fuzzy(query, distance)
+            if scores:
+                break
+
+        start = bisect_left(self.names, query)
+        for i in range(start, min(start + limit, len(self.names))):
+            if not self.names[i].startswith(query):
+                break
+            scores.setdefault(i, max_distance + 1)
+
+        ranked = sorted(scores, key=lambda i: (scores[i], -len(self.people[i]), self.names[i]))[:limit]
+        return [(self.names[i], self.people[i]) for i in ranked]
+
+    def fuzzy(self, query, max_distance):
+        """
+        Returns a dict mapping the indices of all names within
+        `max_distance` edits of the lowercase query to their distance.
+        """
+        # One edit changes at most three trigrams and shifts the others by
+        # one position, so a name within k edits keeps all but 3k of the
+        # query's trigrams within k positions of where the query has them.
+        # Out of any m of those trigrams it keeps at least m - 3k, so the
+        # rarest few are read and only names found often enough are checked.
+        postings = []
+        for position, gram in enumerate(trigrams(query)):
+            shifts = range(max(0, position - max_distance), position + max_distance + 1)
+            lists = [self.grams.get((shift, gram), ()) for shift in shifts]
+            postings.append((sum(map(len, lists)), lists))
+        postings.sort(key=lambda posting: posting[0])
+
+        shared = Counter()
+        read = used = 0
+        for size, lists in postings:
+            if used > 3 * max_distance and read + size > POSTINGS_BUDGET:
+                break
+            read += size
+            used += 1
+            for names in lists:
+                shared.update(names)
+        needed = max(1, used - 3 * max_distance)
+
+        scores = {}
+        for i, count in shared.items():
+            if count >= needed:
+                distance = edit_distance(query, self.names[i], max_distance)
+                if distance is not None:
+                    scores[i] = distance
+        return scores
+
+
+def trigrams(name):
+    """
+    Returns the character trigrams of a name, padded at both ends
+    so that short names and word boundaries get trigrams too.
+    """
+    padded = f"  {name} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Levenshtein distance between two strings,
+    or None if it is larger than `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (x != y),
+            ))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
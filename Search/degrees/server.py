@@ -0,0 +1,175 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+from cache import PathCache
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+
+
+class LatencyHistogram():
+    """
+    Counts request latencies into fixed buckets. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        milliseconds = seconds * 1000
+        with self.lock:
+            for i, bound in enumerate(BUCKETS):
+                if milliseconds <= bound:
+                    self.counts[i] += 1
+                    break
+            self.total += milliseconds
+
+    def stats(self):
+        """
+        Returns the bucket counts, keyed by their upper bound in ms,
+        with the count and mean latency.
+        """
+        with self.lock:
+            count = sum(self.counts)
+            return {
+                "count": count,
+                "mean_ms": self.total / count if count else 0.0,
+                "buckets_ms": {
+                    ("inf" if bound == float("inf") else str(bound)): n
+                    for bound, n in zip(BUCKETS, self.counts)
+                },
+            }
+
+
+# One latency histogram per endpoint
+latencies = {}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Answers GET requests:
+
+        /path?source=<person_id>&target=<person_id>[&mode=<mode>]
+        /neighbors?person=<person_id>
+        /names?q=<name>
+        /stats
+    """
+
+    mode = "graph-bidirectional"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        routes = {
+            "/path": self.path_query,
+            "/neighbors": self.neighbors_query,
+            "/names": self.names_query,
+            "/stats": self.stats_query,
+        }
+        if url.path not in routes:
+            return self.reply(404, {"error": "not found"})
+
+        start = time.perf_counter()
+        try:
+            status, body = routes[url.path](query)
+        except KeyError as e:
+            status, body = 400, {"error": f"missing parameter {e}"}
+        except ValueError as e:
+            status, body = 400, {"error": f"invalid parameter: {e}"}
+        latencies[url.path].record(time.perf_counter() - start)
+        self.reply(status, body)
+
+    def path_query(self, query):
+        source, target = query["source"], query["target"]
+        mode = query.get("mode", self.mode)
+        if mode not in degrees.graph_modes:
+            return 400, {"error": f"unknown mode {mode}"}
+        for person_id in (source, target):
+            if degrees.graph.person_index(person_id) is None:
+                return 404, {"error": f"unknown person {person_id}"}
+        path = degrees.find_path(source, target, mode)
+        return 200, {
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": path,
+        }
+
+    def neighbors_query(self, query):
+        person_id = query["person"]
+        if degrees.graph.person_index(person_id) is None:
+            return 404, {"error": f"unknown person {person_id}"}
+        return 200, {
+            "person": person_id,
+            "neighbors": sorted(degrees.neighbors_for_person(person_id)),
+        }
+
+    def names_query(self, query):
+        candidates = degrees.names_index().search(query["q"], int(query.get("limit", 10)))
+        return 200, {
+            "candidates": [
+                {"name": name, "person_ids": person_ids}
+                for name, person_ids in candidates
+            ],
+        }
+
+    def stats_query(self, query):
+        return 200, {
+            "cache": degrees.path_cache.stats(),
+            "latency": {path: histogram.stats() for path, histogram in latencies.items()},
+        }
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet, /stats has the numbers
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve degrees of separation queries over HTTP on localhost."
+    )
+    parser.add_argument("directory", help="directory with people.csv, movies.csv and stars.csv")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--mode", default="graph-bidirectional",
+                        choices=sorted(degrees.graph_modes))
+    parser.add_argument("--cache-size", type=int, default=100000,
+                        help="most recent paths to keep")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_graph(args.directory)
+    if args.mode == "graph-astar":
+        degrees.load_landmarks(args.directory)
+    print("Data loaded.")
+
+    degrees.path_cache = PathCache(args.cache_size)
+    Handler.mode = args.mode
+    for path in ("/path", "/neighbors", "/names", "/stats"):
+        latencies[path] = LatencyHistogram()
+
+    # One thread per connection, so a slow query doesn't hold up other clients
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(f"Serving on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
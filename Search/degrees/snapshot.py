@@ -0,0 +1,282 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from graph import Graph
+
+MAGIC = b"DEGREES1"
+
+# Name of the snapshot file, written next to the CSV files
+FILENAME = "graph.snapshot"
+
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_people", "name_order")
+
+STRINGS = ("person_ids", "person_names", "person_births",
+           "movie_ids", "movie_titles", "movie_years")
+
+# Most ingested rows kept in an overlay file before save compacts the graph
+OVERLAY_LIMIT = 100000
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one utf-8 blob
+    plus an array of offsets into it.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def pack(cls, strings):
+        """
+        Returns (offsets, blob) bytes for a sequence of strings.
+        """
+        offsets = array("q", [0])
+        parts = []
+        for string in strings:
+            part = string.encode("utf-8")
+            parts.append(part)
+            offsets.append(offsets[-1] + len(part))
+        return offsets.tobytes(), b"".join(parts)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+def fingerprint(directory):
+    """
+    Returns the (mtime, size) of every source CSV file.
+    """
+    stats = [os.stat(os.path.join(directory, source)) for source in SOURCES]
+    return [[stat.st_mtime_ns, stat.st_size] for stat in stats]
+
+
+def typecode(values):
+    """
+    Returns the item type of an array or of a memory-mapped section.
+    """
+    if isinstance(values, memoryview):
+        return values.format
+    return values.typecode
+
+
+def overlay_rows(graph):
+    """
+    Returns the (people, movies, stars) rows ingested into a graph,
+    in the order that gives them the same indices when ingested again.
+    """
+    people = [
+        [person_id, graph.person_names[p], graph.person_births[p]]
+        for person_id, p in graph.added_people.items()
+    ]
+    movies = [
+        [movie_id, graph.movie_titles[m], graph.movie_years[m]]
+        for movie_id, m in graph.added_movies.items()
+    ]
+    stars = [
+        [graph.person_ids[p], graph.movie_ids[m]]
+        for p, added in graph.added_person_movies.items()
+        for m in added
+    ]
+    return people, movies, stars
+
+
+def read_header(filename):
+    """
+    Returns the header of a snapshot file, or None if it is missing or corrupt.
+    """
+    try:
+        with open(filename, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = struct.unpack("<q", f.read(8))
+            return json.loads(f.read(length))
+    except (OSError, struct.error, ValueError):
+        return None
+
+
+def save_overlay(graph, directory, filename):
+    """
+    Write what was ingested into a graph to an overlay file next to the
+    snapshot its CSR arrays came from, tagged with both the snapshot's
+    and the current fingerprint of the CSV files.
+
+    Returns False, writing nothing, if the overlay is too big or the
+    snapshot on disk is not the one the graph was built from.
+    """
+    people, movies, stars = overlay_rows(graph)
+    if len(people) + len(movies) + len(stars) > OVERLAY_LIMIT:
+        return False
+
+    header = read_header(filename)
+    if header is None:
+        return False
+    sections = header["sections"]
+    if (sections["person_ids.offsets"][1] // 8 - 1 != len(graph.person_ids.base)
+            or sections["movie_ids.offsets"][1] // 8 - 1 != len(graph.movie_ids.base)
+            or sections["person_movies"][1] != len(graph.person_movies) * graph.person_movies.itemsize):
+        return False
+
+    data = json.dumps({
+        "base": header["sources"],
+        "sources": fingerprint(directory),
+        "people": people,
+        "movies": movies,
+        "stars": stars,
+    }).encode("utf-8")
+    temporary = f"{filename}.overlay.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, f"{filename}.overlay")
+    return True
+
+
+def load_overlay(filename, base, sources):
+    """
+    Returns the overlay of a snapshot tagged with the given fingerprints,
+    or None if it is missing, corrupt or tagged with others.
+    """
+    try:
+        with open(f"{filename}.overlay", "rb") as f:
+            overlay = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if overlay["base"] != base or overlay["sources"] != sources:
+        return None
+    return overlay
+
+
+def save(graph, directory, filename=None):
+    """
+    Write a graph to a snapshot file, tagged with the fingerprint
+    of the CSV files it was loaded from.
+
+    A graph with rows ingested since it was loaded only has those rows
+    written, to an overlay file, while they stay under OVERLAY_LIMIT.
+    Past that it is compacted and written whole.
+    """
+    filename = filename or os.path.join(directory, FILENAME)
+    if graph.ingested():
+        if save_overlay(graph, directory, filename):
+            return
+        graph = graph.compact()
+
+    sections = []
+    for name in ARRAYS:
+        sections.append((name, getattr(graph, name).tobytes()))
+    for name in STRINGS:
+        offsets, blob = StringTable.pack(getattr(graph, name))
+        sections.append((f"{name}.offsets", offsets))
+        sections.append((f"{name}.blob", blob))
+
+    # Lay sections out back to back, each aligned to 8 bytes
+    layout = {}
+    position = 0
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        position += len(data) + -len(data) % 8
+
+    header = json.dumps({
+        "sources": fingerprint(directory),
+        "typecodes": {name: typecode(getattr(graph, name)) for name in ARRAYS},
+        "sections": layout,
+    }).encode("utf-8")
+    header += b" " * (-len(header) % 8)
+
+    # Write to a temporary file first so readers never see half a snapshot
+    temporary = f"{filename}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<q", len(header)))
+        f.write(header)
+        for name, data in sections:
+            f.write(data)
+            f.write(bytes(-len(data) % 8))
+    os.replace(temporary, filename)
+
+    # The new snapshot already holds anything an old overlay did
+    try:
+        os.remove(f"{filename}.overlay")
+    except FileNotFoundError:
+        pass
+
+
+def load(directory, filename=None):
+    """
+    Memory-map a snapshot file and return its graph, with its overlay
+    ingested if the CSV files changed since the snapshot was written.
+    Returns None if it is missing, corrupt or older than the CSV files
+    with no overlay to bring it up to date.
+    """
+    filename = filename or os.path.join(directory, FILENAME)
+    try:
+        with open(filename, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if data[:len(MAGIC)] != MAGIC:
+            return None
+        start = len(MAGIC) + 8
+        (length,) = struct.unpack("<q", data[len(MAGIC):start])
+        header = json.loads(data[start:start + length])
+    except (struct.error, ValueError):
+        return None
+    sources = fingerprint(directory)
+    overlay = None
+    if header["sources"] != sources:
+        overlay = load_overlay(filename, header["sources"], sources)
+        if overlay is None:
+            return None
+
+    body = memoryview(data)[start + length:]
+
+    def section(name):
+        offset, size = header["sections"][name]
+        return body[offset:offset + size]
+
+    parts = {}
+    for name in ARRAYS:
+        parts[name] = section(name).cast(header["typecodes"][name])
+    for name in STRINGS:
+        parts[name] = StringTable(
+            section(f"{name}.offsets").cast("q"), section(f"{name}.blob")
+        )
+    graph = Graph(**parts)
+    if overlay is not None:
+        graph.ingest(overlay["people"], overlay["movies"], overlay["stars"])
+    return graph
+
+
+def load_or_build(directory):
+    """
+    Returns the graph for a directory, from its snapshot if it is
+    up to date, otherwise from the CSV files, writing a new snapshot.
+    """
+    graph = load(directory)
+    if graph is not None:
+        return graph
+
+    graph = Graph.from_csv(directory)
+    try:
+        save(graph, directory)
+    except OSError:
+        # A read-only data directory just means no cache
+        pass
+    return graph
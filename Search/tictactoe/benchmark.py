@@ -0,0 +1,252 @@
+"""
+Compares the Tic Tac Toe search modes on every opening position
+"""
+
+import sys
+import time
+
+import table
+import tictactoe as ttt
+from bitboard import X, Bitboard
+from mcts import MCTSPlayer
+
+# Playouts per move of the MCTS mode
+ITERATIONS = 2000
+
+
+def openings(moves):
+    """
+    Returns every non-terminal Bitboard reachable within `moves` moves
+    of the empty board.
+    """
+    found = {}
+
+    def visit(bits):
+        if bits.terminal() or bits.key() in found:
+            return
+        found[bits.key()] = Bitboard(bits.x, bits.o)
+        if len(bits.history) < moves:
+            for cell in bits.actions():
+                bits.make(cell)
+                visit(bits)
+                bits.unmake()
+
+    visit(Bitboard())
+    return list(found.values())
+
+
+class SingleBound():
+    """
+    The previous search: maxvalue and minvalue pass on a single bound c,
+    try cells in plain order and share a transposition table.
+    """
+
+    def __init__(self):
+        self.table = {}
+        self.nodes = 0
+
+    def value(self, bits):
+        return self.maxvalue(bits, 10) if bits.player() == X else self.minvalue(bits, -10)
+
+    def choose(self, bits):
+        """
+        Returns the best cell, searched like the previous minimax root.
+        """
+        maximizing = bits.player() == X
+        v = -10 if maximizing else 10
+        best = None
+        for cell in bits.actions():
+            bits.make(cell)
+            value = self.minvalue(bits, v) if maximizing else self.maxvalue(bits, v)
+            bits.unmake()
+            if (value > v) if maximizing else (value < v):
+                v, best = value, cell
+        return best
+
+    def maxvalue(self, bits, c):
+        self.nodes += 1
+        key, _ = bits.canonical()
+        value = self.probe(key, -10, c)
+        if value is not None:
+            return value
+
+        if bits.terminal():
+            v = bits.utility()
+        else:
+            v = -10
+            for cell in bits.actions():
+                bits.make(cell)
+                v = max(v, self.minvalue(bits, v))
+                bits.unmake()
+                if v >= c:
+                    break
+
+        self.store(key, v, -10, c)
+        return v
+
+    def minvalue(self, bits, c):
+        self.nodes += 1
+        key, _ = bits.canonical()
+        value = self.probe(key, c, 10)
+        if value is not None:
+            return value
+
+        if bits.terminal():
+            v = bits.utility()
+        else:
+            v = 10
+            for cell in bits.actions():
+                bits.make(cell)
+                v = min(v, self.maxvalue(bits, v))
+                bits.unmake()
+                if v <= c:
+                    break
+
+        self.store(key, v, c, 10)
+        return v
+
+    def probe(self, key, alpha, beta):
+        kind, value = self.table.get(key, (None, None))
+        if kind == ttt.EXACT or (kind == ttt.LOWER and value >= beta) or (kind == ttt.UPPER and value <= alpha):
+            return value
+        return None
+
+    def store(self, key, value, alpha, beta):
+        kind = ttt.UPPER if value <= alpha else ttt.LOWER if value >= beta else ttt.EXACT
+        if self.table.get(key, (None, None))[0] != ttt.EXACT:
+            self.table[key] = (kind, value)
+
+
+def alpha_beta_nodes(bits):
+    """
+    Returns (value, nodes) of the current search from a cold start.
+    """
+    ttt.reset_search(clear_table=True)
+    search = ttt.maxvalue if bits.player() == X else ttt.minvalue
+    value = search(bits, -10, 10)
+    return value, ttt.search_stats()["nodes"]
+
+
+def single_bound_nodes(bits):
+    """
+    Returns (value, nodes) of the previous search from a cold start.
+    """
+    search = SingleBound()
+    value = search.value(bits)
+    return value, search.nodes
+
+
+def table_mode(board, stats):
+    return ttt.minimax(board, stats=stats)
+
+
+def alpha_beta_mode(board, stats):
+    ttt.reset_search(clear_table=True)
+    return ttt.minimax(board, solved=False, stats=stats)
+
+
+def warm_alpha_beta_mode(board, stats):
+    # Keeps the transposition table of the positions searched before
+    return ttt.minimax(board, solved=False, stats=stats)
+
+
+def depth_limited_mode(board, stats):
+    return ttt.minimax(board, depth=2, stats=stats)
+
+
+def parallel_mode(board, stats):
+    return ttt.minimax(board, depth=9, workers=2, stats=stats)
+
+
+def single_bound_mode(board, stats):
+    start = time.perf_counter()
+    search = SingleBound()
+    cell = search.choose(Bitboard.from_rows(board))
+    stats["nodes"] = search.nodes
+    stats["seconds"] = time.perf_counter() - start
+    return divmod(cell, 3)
+
+
+def mcts_mode(board, stats):
+    start = time.perf_counter()
+    action = MCTSPlayer(seed=0).choose(board, iterations=ITERATIONS)
+    stats["nodes"] = ITERATIONS
+    stats["seconds"] = time.perf_counter() - start
+    return action
+
+
+# Each mode takes a board and a stats dict to fill, and returns its move
+modes = {
+    "table": table_mode,
+    "alpha-beta": alpha_beta_mode,
+    "alpha-beta warm": warm_alpha_beta_mode,
+    "single bound": single_bound_mode,
+    "depth 2": depth_limited_mode,
+    "parallel": parallel_mode,
+    "mcts": mcts_mode,
+}
+
+
+def compare_modes(positions):
+    """
+    Runs every mode on every position and returns a dict mapping each
+    mode to its summed stats and how many of its moves were optimal.
+    """
+    ttt.reset_search(clear_table=True)
+    results = {}
+    for name, mode in modes.items():
+        totals = {"nodes": 0, "cutoffs": 0, "max_depth": 0, "hits": 0, "seconds": 0.0, "optimal": 0}
+        for bits in positions:
+            board = bits.to_rows()
+            stats = {}
+            i, j = mode(board, stats)
+            for counter in ("nodes", "cutoffs", "hits", "seconds"):
+                totals[counter] += stats.get(counter, 0)
+            totals["max_depth"] = max(totals["max_depth"], stats.get("max_depth", 0))
+
+            # A move is optimal if it keeps the game value of the position
+            after = Bitboard(bits.x, bits.o)
+            after.make(3 * i + j)
+            if table.lookup(after)[0] == table.lookup(bits)[0]:
+                totals["optimal"] += 1
+        results[name] = totals
+    return results
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [moves]")
+    moves = int(sys.argv[1]) if len(sys.argv) == 2 else 2
+
+    positions = openings(moves)
+    totals = {"single bound": 0, "alpha-beta": 0}
+    print(f"{'position':>12}  {'value':>5}  {'single bound':>12}  {'alpha-beta':>10}")
+    for bits in positions:
+        value, old = single_bound_nodes(Bitboard(bits.x, bits.o))
+        check, new = alpha_beta_nodes(Bitboard(bits.x, bits.o))
+        if check != value:
+            raise Exception(f"searches disagree on position {bits.key()}")
+        totals["single bound"] += old
+        totals["alpha-beta"] += new
+        board = "".join(cell or "." for row in bits.to_rows() for cell in row)
+        print(f"{board:>12}  {value:>5}  {old:>12}  {new:>10}")
+
+    print()
+    print(f"{len(positions)} positions within {moves} moves of the start.")
+    for name, total in totals.items():
+        print(f"{name:>12}: {total} nodes")
+    print(f"alpha-beta searches {totals['single bound'] / totals['alpha-beta']:.2f}x fewer nodes.")
+    print()
+
+    print("Search modes on the same positions:")
+    print(f"{'mode':>16}  {'nodes':>8}  {'cutoffs':>8}  {'depth':>5}  {'hits':>6}  {'ms/move':>8}  {'optimal':>8}")
+    for name, result in compare_modes(positions).items():
+        milliseconds = result["seconds"] / len(positions) * 1000
+        optimal = f"{result['optimal']}/{len(positions)}"
+        print(f"{name:>16}  {result['nodes']:>8}  {result['cutoffs']:>8}  {result['max_depth']:>5}  "
+              f"{result['hits']:>6}  {milliseconds:>8.3f}  {optimal:>8}")
+    print("mcts counts playouts as nodes.")
+
+
+if __name__ == "__main__":
+    main()
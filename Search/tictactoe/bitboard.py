@@ -0,0 +1,195 @@
+"""
+Tic Tac Toe on bitboards
+
+Each player's marks are one 9-bit integer, with cell (i, j) at bit 3 * i + j.
+"""
+
+X = "X"
+O = "O"
+
+FULL = 0b111111111
+
+# The 8 lines of three cells
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+
+# Number of set bits and list of set cells of every 9-bit integer
+POPCOUNT = tuple(bin(bits).count("1") for bits in range(FULL + 1))
+CELLS = tuple(
+    tuple(cell for cell in range(9) if bits >> cell & 1)
+    for bits in range(FULL + 1)
+)
+
+
+
+def rotate(cell):
+    """
+    Returns where a cell goes when the board turns a quarter clockwise.
+    """
+    i, j = divmod(cell, 3)
+    return 3 * j + 2 - i
+
+
+def reflect(cell):
+    """
+    Returns where a cell goes when the board is mirrored left to right.
+    """
+    i, j = divmod(cell, 3)
+    return 3 * i + 2 - j
+
+
+def symmetries():
+    """
+    Returns the 8 symmetries of the square as tuples mapping each cell to
+    where it goes, the 4 rotations then the same rotations mirrored.
+    """
+    rotations = [tuple(range(9))]
+    for _ in range(3):
+        rotations.append(tuple(rotate(cell) for cell in rotations[-1]))
+    mirrored = [tuple(reflect(cell) for cell in cells) for cells in rotations]
+    return tuple(rotations + mirrored)
+
+
+SYMMETRIES = symmetries()
+
+# Where each symmetry sends a cell back from
+INVERSES = tuple(
+    tuple(cells.index(cell) for cell in range(9))
+    for cells in SYMMETRIES
+)
+
+# Every 9-bit integer moved by each symmetry
+TRANSFORMS = tuple(
+    tuple(
+        sum(1 << cells[cell] for cell in CELLS[bits])
+        for bits in range(FULL + 1)
+    )
+    for cells in SYMMETRIES
+)
+
+
+def wins(bits):
+    """
+    Returns True if the marks in `bits` complete a line.
+    """
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+class Bitboard():
+    """
+    A mutable board that makes and unmakes moves in place.
+    """
+
+    __slots__ = ("x", "o", "history")
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+        self.history = []
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds a bitboard from a list of lists of X, O and None.
+        """
+        x = o = 0
+        for i, row in enumerate(rows):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (3 * i + j)
+                elif cell == O:
+                    o |= 1 << (3 * i + j)
+        return cls(x, o)
+
+    def to_rows(self, empty=None):
+        """
+        Returns the board as a list of lists of X, O and `empty`.
+        """
+        return [
+            [
+                X if self.x >> (3 * i + j) & 1 else O if self.o >> (3 * i + j) & 1 else empty
+                for j in range(3)
+            ]
+            for i in range(3)
+        ]
+
+    def key(self):
+        """
+        Returns the board as one 18-bit integer.
+        """
+        return self.x | self.o << 9
+
+    def canonical(self):
+        """
+        Returns (key, symmetry): the smallest key of the board under the 8
+        symmetries of the square, and the symmetry that gives it. Boards that
+        are rotations or reflections of each other share the same key.
+        """
+        best = symmetry = None
+        for t, transform in enumerate(TRANSFORMS):
+            key = transform[self.x] | transform[self.o] << 9
+            if best is None or key < best:
+                best, symmetry = key, t
+        return best, symmetry
+
+    def player(self):
+        """
+        Returns the player who has the next turn.
+        """
+        return X if POPCOUNT[self.x | self.o] % 2 == 0 else O
+
+    def actions(self):
+        """
+        Returns the tuple of empty cells.
+        """
+        return CELLS[FULL & ~(self.x | self.o)]
+
+    def make(self, cell):
+        """
+        Plays the next player's mark on an empty cell.
+        """
+        if POPCOUNT[self.x | self.o] % 2 == 0:
+            self.x |= 1 << cell
+        else:
+            self.o |= 1 << cell
+        self.history.append(cell)
+
+    def unmake(self):
+        """
+        Takes back the last move made.
+        """
+        bit = 1 << self.history.pop()
+        self.x &= ~bit
+        self.o &= ~bit
+
+    def winner(self):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        if wins(self.x):
+            return X
+        if wins(self.o):
+            return O
+        return None
+
+    def terminal(self):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.x | self.o) == FULL or wins(self.x) or wins(self.o)
+
+    def utility(self):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if wins(self.x):
+            return 1
+        if wins(self.o):
+            return -1
+        return 0
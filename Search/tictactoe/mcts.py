@@ -0,0 +1,151 @@
+"""
+Monte Carlo Tree Search player for Tic Tac Toe boards of any size
+
+Grows a search tree with UCT for as long as its budget allows and plays
+the move tried most often. The tree below the move played is kept, so
+the next call starts from what was already learned about the position.
+"""
+
+import math
+import random
+import time
+
+import mnk
+import tictactoe as ttt
+
+# Default budget per move when neither seconds nor iterations are given
+SECONDS = 1.0
+
+
+class Node():
+    __slots__ = ("board", "action", "parent", "children", "untried",
+                 "visits", "wins", "winner", "over")
+
+    def __init__(self, board, action, parent, k):
+        self.board = board
+        self.action = action
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        # Wins of the player who made `action`, draws count half
+        self.wins = 0.0
+
+        if action is None:
+            self.winner = ttt.winner(board, k)
+        else:
+            # Only the move just made can have won
+            self.winner = board[action[0]][action[1]] if mnk.wins_at(board, action, k) else None
+        self.untried = [] if self.winner else sorted(ttt.actions(board))
+        self.over = self.winner is not None or not self.untried
+
+
+class MCTSPlayer():
+    """
+    Chooses moves for whoever is to move, reusing its tree between calls.
+    """
+
+    def __init__(self, k=3, exploration=math.sqrt(2), seed=None):
+        self.k = k
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.root = None
+
+    def choose(self, board, seconds=None, iterations=None):
+        """
+        Returns the action that looks best after searching for `seconds`
+        or `iterations` playouts, whichever runs out first, but always at
+        least one. With neither, searches for SECONDS. Returns None if the
+        game is over.
+        """
+        if seconds is None and iterations is None:
+            seconds = SECONDS
+        deadline = None if seconds is None else time.perf_counter() + seconds
+
+        root = self.reuse(board)
+        if root.over:
+            return None
+
+        # One playout even on a spent budget, so the root has a move to play
+        self.iterate(root)
+        done = 1
+        while iterations is None or done < iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.iterate(root)
+            done += 1
+
+        best = max(root.children, key=lambda child: child.visits)
+        # Keep the subtree of the move played for the next call
+        best.parent = None
+        self.root = best
+        return best.action
+
+    def reuse(self, board):
+        """
+        Returns the node of the tree for the board, searching the last
+        root and the replies to it, or a new root if it is not there.
+        """
+        if self.root is not None:
+            if self.root.board == board:
+                return self.root
+            for child in self.root.children:
+                if child.board == board:
+                    child.parent = None
+                    self.root = child
+                    return child
+        self.root = Node([row[:] for row in board], None, None, self.k)
+        return self.root
+
+    def iterate(self, root):
+        """
+        Runs one selection, expansion, playout and backup from the root.
+        """
+        node = root
+
+        # Selection: follow UCT down through fully expanded nodes
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(
+                node.children,
+                key=lambda child: child.wins / child.visits
+                + self.exploration * math.sqrt(log_visits / child.visits),
+            )
+
+        # Expansion: add one untried move
+        if node.untried:
+            action = node.untried.pop(self.random.randrange(len(node.untried)))
+            child = Node(ttt.result(node.board, action), action, node, self.k)
+            node.children.append(child)
+            node = child
+
+        winner = node.winner if node.over else self.playout(node.board)
+
+        # Backup: score each node for the player who moved into it
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif node.action is not None and node.board[node.action[0]][node.action[1]] == winner:
+                node.wins += 1
+            node = node.parent
+
+    def playout(self, board):
+        """
+        Plays random moves on a scratch copy of the board until the game
+        ends, and returns the winner or None for a draw.
+        """
+        scratch = [row[:] for row in board]
+        mark = ttt.player(board)
+        cells = [
+            (i, j)
+            for i, row in enumerate(scratch)
+            for j, cell in enumerate(row)
+            if cell is ttt.EMPTY
+        ]
+        self.random.shuffle(cells)
+        for i, j in cells:
+            scratch[i][j] = mark
+            if mnk.wins_at(scratch, (i, j), self.k):
+                return mark
+            mark = ttt.O if mark == ttt.X else ttt.X
+        return None
@@ -0,0 +1,263 @@
+"""
+Tic Tac Toe generalized to m x n boards with k in a row to win
+
+Boards are lists of m rows of n cells, like the 3 x 3 ones in tictactoe.py.
+Exhaustive search is out of reach beyond 3 x 3, so the search here stops
+at a given depth and scores the positions it reaches with an evaluation
+function instead.
+"""
+
+import math
+
+from bitboard import O, X
+
+EMPTY = None
+
+# Directions of lines, each checked both ways from a cell
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Wins score at least 1 or at most -1, evaluations stay strictly in between
+WIN = 1
+
+# Per cell, how much its moves have caused cutoffs, see ordered()
+history = {}
+
+# Boards with at most this many cells search every empty cell
+SMALL = 16
+
+
+def initial_state(m, n):
+    """
+    Returns an empty board of m rows and n columns.
+    """
+    return [[EMPTY] * n for _ in range(m)]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    count = sum(len(row) - row.count(EMPTY) for row in board)
+    return X if count % 2 == 0 else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {
+        (i, j)
+        for i, row in enumerate(board)
+        for j, cell in enumerate(row)
+        if cell is EMPTY
+    }
+
+
+def run_length(board, i, j, di, dj):
+    """
+    Returns how many cells past (i, j) in direction (di, dj) hold
+    the same mark as (i, j).
+    """
+    m, n = len(board), len(board[0])
+    mark = board[i][j]
+    length = 0
+    i, j = i + di, j + dj
+    while 0 <= i < m and 0 <= j < n and board[i][j] == mark:
+        length += 1
+        i, j = i + di, j + dj
+    return length
+
+
+def wins_at(board, action, k):
+    """
+    Returns True if the mark at `action` is part of k in a row.
+    Only lines through that cell are checked, so after each move
+    this is all it takes to know whether the move won.
+    """
+    i, j = action
+    if board[i][j] is EMPTY:
+        return False
+    for di, dj in DIRECTIONS:
+        if 1 + run_length(board, i, j, di, dj) + run_length(board, i, j, -di, -dj) >= k:
+            return True
+    return False
+
+
+def winner(board, k):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell is EMPTY:
+                continue
+            # Only look forward, every line is found from its first cell
+            for di, dj in DIRECTIONS:
+                if run_length(board, i, j, di, dj) + 1 >= k:
+                    return cell
+    return None
+
+
+def terminal(board, k):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return winner(board, k) is not None or all(EMPTY not in row for row in board)
+
+
+def utility(board, k):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    w = winner(board, k)
+    if w == X:
+        return WIN
+    if w == O:
+        return -WIN
+    return 0
+
+
+def candidates(board, radius=1):
+    """
+    Returns the empty cells within `radius` of a mark, or the center of an
+    empty board. Moves far from every mark are almost never best and
+    would make wide boards impossible to search. Small boards, where they
+    can be, return every empty cell.
+    """
+    m, n = len(board), len(board[0])
+    if m * n <= SMALL:
+        return sorted(actions(board))
+    marked = False
+    cells = set()
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell is EMPTY:
+                continue
+            marked = True
+            for a in range(max(0, i - radius), min(m, i + radius + 1)):
+                for b in range(max(0, j - radius), min(n, j + radius + 1)):
+                    if board[a][b] is EMPTY:
+                        cells.add((a, b))
+    if not marked:
+        return [(m // 2, n // 2)]
+    # Marks walled in by other marks leave only far cells
+    return sorted(cells or actions(board))
+
+
+def ordered(board):
+    """
+    Returns the candidate cells, those that caused the most cutoffs
+    first, then the ones nearest the center.
+    """
+    m, n = len(board), len(board[0])
+    return sorted(
+        candidates(board),
+        key=lambda cell: (-history.get(cell, 0), abs(cell[0] - m // 2) + abs(cell[1] - n // 2)),
+    )
+
+
+def evaluate_lines(board, k):
+    """
+    Scores a board for X strictly between -1 and 1.
+
+    Every window of k cells in a row that only one player has marks in
+    could still become their win, and counts more the fuller it is.
+    """
+    m, n = len(board), len(board[0])
+    score = 0
+    for i in range(m):
+        for j in range(n):
+            for di, dj in DIRECTIONS:
+                # Windows starting at (i, j) that fit on the board
+                end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                if not (0 <= end_i < m and 0 <= end_j < n):
+                    continue
+                xs = ys = 0
+                for step in range(k):
+                    cell = board[i + step * di][j + step * dj]
+                    if cell == X:
+                        xs += 1
+                    elif cell == O:
+                        ys += 1
+                if xs and not ys:
+                    score += 4 ** xs
+                elif ys and not xs:
+                    score -= 4 ** ys
+    # Squash into (-1, 1) so any win outweighs it
+    return score / (abs(score) + 4 ** k)
+
+
+def best_action(board, k, depth, evaluate=evaluate_lines, stats=None):
+    """
+    Returns the best action for the current player found by alpha-beta
+    search `depth` moves deep, scoring the positions there with
+    `evaluate(board, k)`. If given, `stats` is a dict whose "nodes",
+    "cutoffs" and "max_depth" counters are updated.
+    """
+    board = [row[:] for row in board]
+    empty = sum(row.count(EMPTY) for row in board)
+    if empty == 0 or winner(board, k) is not None:
+        return None
+
+    mark = player(board)
+    maximizing = mark == X
+    best = None
+    alpha, beta = -math.inf, math.inf
+    for i, j in ordered(board):
+        board[i][j] = mark
+        value = alphabeta(board, k, (i, j), empty - 1, depth - 1, alpha, beta, evaluate, stats)
+        board[i][j] = EMPTY
+        if maximizing and value > alpha:
+            alpha, best = value, (i, j)
+        elif not maximizing and value < beta:
+            beta, best = value, (i, j)
+    return best
+
+
+def alphabeta(board, k, last, empty, depth, alpha, beta, evaluate, stats=None, ply=1):
+    """
+    Returns the value for X of a board that `last` was just played on,
+    `ply` moves below the root, searched `depth` moves deeper within the
+    (alpha, beta) window. A win scores WIN plus the depth left when it
+    happened, so sooner wins and later losses are preferred. The board is
+    changed in place and restored before returning.
+    """
+    if stats is not None:
+        stats["nodes"] += 1
+        stats["max_depth"] = max(stats["max_depth"], ply)
+
+    # Only the last move can have ended the game
+    if wins_at(board, last, k):
+        mover = board[last[0]][last[1]]
+        return WIN + depth if mover == X else -(WIN + depth)
+    if empty == 0:
+        return 0
+    if depth <= 0:
+        return evaluate(board, k)
+
+    mark = O if board[last[0]][last[1]] == X else X
+    if mark == X:
+        v = -math.inf
+        for i, j in ordered(board):
+            board[i][j] = mark
+            v = max(v, alphabeta(board, k, (i, j), empty - 1, depth - 1, alpha, beta, evaluate, stats, ply + 1))
+            board[i][j] = EMPTY
+            alpha = max(alpha, v)
+            if alpha >= beta:
+                history[(i, j)] = history.get((i, j), 0) + depth * depth
+                if stats is not None:
+                    stats["cutoffs"] += 1
+                break
+    else:
+        v = math.inf
+        for i, j in ordered(board):
+            board[i][j] = mark
+            v = min(v, alphabeta(board, k, (i, j), empty - 1, depth - 1, alpha, beta, evaluate, stats, ply + 1))
+            board[i][j] = EMPTY
+            beta = min(beta, v)
+            if alpha >= beta:
+                history[(i, j)] = history.get((i, j), 0) + depth * depth
+                if stats is not None:
+                    stats["cutoffs"] += 1
+                break
+    return v
@@ -0,0 +1,154 @@
+"""
+Root-parallel depth-limited search for m x n Tic Tac Toe boards
+
+The first root move is searched alone, then the others are handed to a
+process pool following Young Brothers Wait. Each one is submitted with
+the best value already known among the moves ordered before it, so
+bounds spread as results come back. The move chosen is always the one
+mnk.best_action would choose from the same root order.
+"""
+
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import mnk
+from bitboard import O, X
+
+
+def search_move(board, k, action, depth, alpha, beta, evaluate):
+    """
+    Returns (value, stats) of playing `action` on the board, searched
+    within (alpha, beta) with `depth` moves including this one.
+    """
+    board = [row[:] for row in board]
+    board[action[0]][action[1]] = mnk.player(board)
+    empty = sum(row.count(mnk.EMPTY) for row in board)
+    stats = {"nodes": 0, "cutoffs": 0, "max_depth": 0}
+    value = mnk.alphabeta(board, k, action, empty, depth - 1, alpha, beta, evaluate, stats)
+    return value, stats
+
+
+def best_action(board, k, depth, evaluate=mnk.evaluate_lines, workers=None, executor=None, stats=None):
+    """
+    Returns the best action for the current player, searching the root
+    moves across `workers` processes, or on `executor` if given. If given,
+    `stats` is a dict whose "nodes", "cutoffs" and "max_depth" counters
+    are updated with the work of every process.
+    """
+    if mnk.terminal(board, k):
+        return None
+
+    moves = mnk.ordered(board)
+    maximizing = mnk.player(board) == X
+    values = {}
+    searched = []
+
+    def window(index):
+        """
+        Returns the window for a root move: bounded only by the values
+        of moves before it, so a move that ties an earlier one can never
+        look better than it.
+        """
+        earlier = [value for i, value in values.items() if i < index]
+        if not earlier:
+            return -math.inf, math.inf
+        if maximizing:
+            return max(earlier), math.inf
+        return -math.inf, min(earlier)
+
+    # The eldest brother is searched first, on its own
+    values[0], eldest = search_move(board, k, moves[0], depth, *window(0), evaluate)
+    searched.append(eldest)
+
+    if len(moves) > 1:
+        pool = executor or ProcessPoolExecutor(workers)
+        try:
+            pending = {}
+            submitted = 1
+            size = workers or os.cpu_count() or 1
+            while submitted < len(moves) or pending:
+                # Keep the pool just full, so later moves get the latest bounds
+                while submitted < len(moves) and len(pending) < size:
+                    alpha, beta = window(submitted)
+                    future = pool.submit(search_move, board, k, moves[submitted], depth, alpha, beta, evaluate)
+                    pending[future] = submitted
+                    submitted += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    values[pending.pop(future)], brother = future.result()
+                    searched.append(brother)
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+    if stats is not None:
+        for counts in searched:
+            stats["nodes"] += counts["nodes"]
+            stats["cutoffs"] += counts["cutoffs"]
+            stats["max_depth"] = max(stats["max_depth"], counts["max_depth"])
+
+    # The first of the best values, as a sequential search would pick
+    best = max(values.values()) if maximizing else min(values.values())
+    return moves[min(i for i, value in values.items() if value == best)]
+
+
+def opening(m, n, moves):
+    """
+    Returns a board of m rows and n columns with `moves` moves played
+    in a fixed spiral around the center.
+    """
+    board = mnk.initial_state(m, n)
+    i, j = m // 2, n // 2
+    steps = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+    length, turn, mark = 1, 0, X
+    while moves > 0:
+        for _ in range(2):
+            di, dj = steps[turn % 4]
+            for _ in range(length):
+                if moves == 0:
+                    break
+                if 0 <= i < m and 0 <= j < n and board[i][j] is mnk.EMPTY:
+                    board[i][j] = mark
+                    mark = O if mark == X else X
+                    moves -= 1
+                i, j = i + di, j + dj
+            turn += 1
+        length += 1
+    return board
+
+
+def main():
+    if len(sys.argv) not in (1, 6):
+        sys.exit("Usage: python parallel.py [m n k depth moves]")
+    m, n, k, depth, moves = (int(arg) for arg in sys.argv[1:]) if len(sys.argv) == 6 else (15, 15, 5, 3, 6)
+    board = opening(m, n, moves)
+
+    mnk.history.clear()
+    start = time.perf_counter()
+    expected = mnk.best_action(board, k, depth)
+    sequential = time.perf_counter() - start
+    print(f"{m}x{n}, {k} in a row, depth {depth}, after {moves} moves")
+    print(f"{'workers':>8}  {'seconds':>8}  {'speedup':>8}  move")
+    print(f"{'-':>8}  {sequential:>8.2f}  {1:>7.2f}x  {expected}")
+
+    workers = 1
+    while workers <= max(4, os.cpu_count() or 1):
+        mnk.history.clear()
+        with ProcessPoolExecutor(workers) as executor:
+            # Start the processes before timing
+            list(executor.map(abs, range(workers)))
+            start = time.perf_counter()
+            action = best_action(board, k, depth, workers=workers, executor=executor)
+            seconds = time.perf_counter() - start
+        if action != expected:
+            raise Exception(f"{workers} workers chose {action} instead of {expected}")
+        print(f"{workers:>8}  {seconds:>8.2f}  {sequential / seconds:>7.2f}x  {action}")
+        workers *= 2
+    print(f"{os.cpu_count()} CPUs available.")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,10 +16,12 @@ screen = pygame.display.set_mode(size)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+statsFont = pygame.font.Font("OpenSans-Regular.ttf", 14)
 
 user = None
 board = ttt.initial_state()
 ai_turn = False
+search_stats = None
 
 while True:
 
@@ -108,11 +110,23 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
+        # Show what the last AI move took
+        if search_stats is not None:
+            line = (f"{search_stats['nodes']} nodes, {search_stats['cutoffs']} cutoffs, "
+                    f"depth {search_stats['max_depth']}, {search_stats['hits']} cache hits, "
+                    f"{search_stats['table_hits']} table hits, "
+                    f"{search_stats['seconds'] * 1000:.2f} ms")
+            stats = statsFont.render(line, True, white)
+            statsRect = stats.get_rect()
+            statsRect.center = ((width / 2), 62)
+            screen.blit(stats, statsRect)
+
         # Check for AI move
         if user != player and not game_over:
             if ai_turn:
                 time.sleep(0.5)
-                move = ttt.minimax(board)
+                search_stats = {}
+                move = ttt.minimax(board, stats=search_stats)
                 board = ttt.result(board, move)
                 ai_turn = False
             else:
@@ -142,5 +156,6 @@ while True:
                     user = None
                     board = ttt.initial_state()
                     ai_turn = False
+                    search_stats = None
 
     pygame.display.flip()
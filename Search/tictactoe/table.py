@@ -0,0 +1,184 @@
+"""
+Perfect-play table of every reachable Tic Tac Toe position
+
+Only one position of each set of rotations and reflections is stored,
+the one with the smallest Bitboard.canonical() key. The file holds the
+base-3 index of each, sum of 3 ** cell times 1 for X and 2 for O, as
+sorted 16-bit integers, followed by one byte per position: the game
+value plus one in the high bits and the best cell of the canonical
+board, or 9 when the game is over, in the low 4 bits.
+
+Build it with `python table.py`, and check it against the live search
+with `python table.py --check`.
+"""
+
+import os
+import sys
+from array import array
+
+from bitboard import FULL, INVERSES, O, X, Bitboard
+
+FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "table.bin")
+
+NO_MOVE = 9
+
+# Base-3 index of the marks of one player
+TERNARY = tuple(
+    sum(3 ** cell for cell in range(9) if bits >> cell & 1)
+    for bits in range(FULL + 1)
+)
+
+# Maps the index of each canonical position to its byte once loaded,
+# see lookup()
+entries = None
+
+
+def index(x, o):
+    """
+    Returns the base-3 index of the marks of X and O.
+    """
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def canonical_index(bits):
+    """
+    Returns (index, symmetry) of the canonical form of a Bitboard.
+    """
+    key, symmetry = bits.canonical()
+    return index(key & FULL, key >> 9), symmetry
+
+
+def build():
+    """
+    Solves every position reachable from the empty board and returns
+    a dict mapping the index of each canonical one to its byte.
+    """
+    table = {}
+
+    def solve(bits):
+        i, _ = canonical_index(bits)
+        if i in table:
+            return (table[i] >> 4) - 1
+
+        # Search the canonical board itself, so the move is in its orientation
+        key, _ = bits.canonical()
+        bits = Bitboard(key & FULL, key >> 9)
+        if bits.terminal():
+            value, move = bits.utility(), NO_MOVE
+        else:
+            sign = 1 if bits.player() == X else -1
+            value, move = -2 * sign, None
+            for cell in bits.actions():
+                bits.make(cell)
+                v = solve(bits)
+                bits.unmake()
+                # Keep the first best cell
+                if v * sign > value * sign:
+                    value, move = v, cell
+
+        table[i] = (value + 1) << 4 | move
+        return value
+
+    solve(Bitboard())
+    return table
+
+
+def save(table, filename=FILENAME):
+    indexes = sorted(table)
+    with open(filename, "wb") as f:
+        f.write(array("H", indexes).tobytes())
+        f.write(bytes(table[i] for i in indexes))
+
+
+def load(filename=FILENAME):
+    """
+    Reads the table, or solves it again if the file is missing.
+    """
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return build()
+    if len(data) % 3 != 0:
+        raise Exception(f"{filename} is not a table of positions")
+
+    count = len(data) // 3
+    indexes = array("H")
+    indexes.frombytes(data[:2 * count])
+    return dict(zip(indexes, data[2 * count:]))
+
+
+def lookup(bits):
+    """
+    Returns (value, cell) for a reachable position, with cell None when
+    the game is over, or None for a position that cannot be reached.
+    """
+    global entries
+    if entries is None:
+        entries = load()
+
+    i, symmetry = canonical_index(bits)
+    entry = entries.get(i)
+    if entry is None:
+        return None
+    move = entry & 0x0F
+    if move == NO_MOVE:
+        return (entry >> 4) - 1, None
+    # Turn the canonical board's move back into this board's orientation
+    return (entry >> 4) - 1, INVERSES[symmetry][move]
+
+
+def check(table):
+    """
+    Compares every entry with the live search and returns the number
+    of positions checked.
+    """
+    import tictactoe as ttt
+
+    checked = 0
+    for i, entry in sorted(table.items()):
+        x = o = 0
+        for cell in range(9):
+            mark = i // 3 ** cell % 3
+            if mark == 1:
+                x |= 1 << cell
+            elif mark == 2:
+                o |= 1 << cell
+        bits = Bitboard(x, o)
+
+        value, move = (entry >> 4) - 1, entry & 0x0F
+        if bits.terminal():
+            live = bits.utility()
+        elif bits.player() == X:
+            live = ttt.maxvalue(bits, -10, 10)
+        else:
+            live = ttt.minvalue(bits, -10, 10)
+        if value != live:
+            raise Exception(f"position {i}: table says {value}, search says {live}")
+
+        if move != NO_MOVE:
+            bits.make(move)
+            search = ttt.minvalue if bits.player() == O else ttt.maxvalue
+            after = search(bits, -10, 10)
+            if after != value:
+                raise Exception(f"position {i}: cell {move} is not a best move")
+        checked += 1
+    return checked
+
+
+def main():
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and sys.argv[1] != "--check"):
+        sys.exit("Usage: python table.py [--check]")
+
+    if len(sys.argv) == 2:
+        checked = check(load())
+        print(f"{checked} positions agree with the search.")
+        return
+
+    table = build()
+    save(table)
+    print(f"Wrote {len(table)} positions to {FILENAME}.")
+
+
+if __name__ == "__main__":
+    main()
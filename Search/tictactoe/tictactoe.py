@@ -2,54 +2,73 @@
 Tic Tac Toe Player
 """
 
-import copy
+import time
+
+import mnk
+import parallel
+import table
+from bitboard import Bitboard, O, X
 
-X = "X"
-O = "O"
 EMPTY = None
 
+# Moves deep that minimax looks on boards other than 3 x 3 with 3 in a row
+DEPTH = 3
+
+# Kinds of values stored in the transposition table
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+
+# Maps a canonical bitboard key to (kind, value) for every position searched,
+# kept for the whole process so later moves reuse earlier searches
+transpositions = {}
+
+# Cells in the order they are tried without a better reason,
+# center, corners, then edges
+ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+RANK = tuple(ORDER.index(cell) for cell in range(9))
+
+# Per ply of the search, the last move that caused a cutoff there
+killers = [None] * 10
 
-def initial_state():
+# Per cell, how much its moves have caused cutoffs
+history = [0] * 9
+
+# Counters of the search, see search_stats()
+counters = {"nodes": 0, "cutoffs": 0, "max_depth": 0, "lookups": 0, "hits": 0, "table_hits": 0}
+
+
+def initial_state(m=3, n=3):
     """
-    Returns starting state of the board.
+    Returns starting state of a board of m rows and n columns.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return mnk.initial_state(m, n)
 
 
-def player(board):
+def classic(board, k=3):
     """
-    Returns player who has the next turn on a board.
+    Returns True for a 3 x 3 board with 3 in a row to win, which is
+    played on bitboards and solved exactly.
     """
+    return k == 3 and len(board) == 3 and all(len(row) == 3 for row in board)
 
-    count = 0
-
-    for row in board:
-        count += row.count(X)
-        count += row.count(O)    
 
-    if count % 2 == 0:
-        return X
-    else:
-        return O
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    if not classic(board):
+        return mnk.player(board)
+    return Bitboard.from_rows(board).player()
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-
-    actions = set()
-
-    for i, row in enumerate(board):
-        for j, col in enumerate(row):
-            if col is EMPTY:
-                actions.add((i,j))
-    
-    return actions
-
-    
+    if not classic(board):
+        return mnk.actions(board)
+    return {divmod(cell, 3) for cell in Bitboard.from_rows(board).actions()}
 
 
 def result(board, action):
@@ -57,140 +76,263 @@ def result(board, action):
     Returns the board that results from making move (i, j) on the board.
     """
 
-    if action[0] < 0 or action[0] > 2 or action[1] < 0 or action[1] > 2:
+    if not (0 <= action[0] < len(board) and 0 <= action[1] < len(board[action[0]])):
         raise Exception("Move not valid")
 
+    if board[action[0]][action[1]] != EMPTY:
+        raise Exception("Move not valid")
 
-    b = copy.deepcopy(board)
-
-    if b[action[0]][action[1]] == EMPTY:
-        b[action[0]][action[1]] = player(board)
-        return b
-    
-    raise Exception("Move not valid")
+    # Only the rows need copying, the cells are immutable
+    b = [row[:] for row in board]
+    b[action[0]][action[1]] = player(board)
+    return b
 
 
-def winner(board):
+def winner(board, k=3):
     """
     Returns the winner of the game, if there is one.
     """
-
-    # rows
-    for row in board:
-        if row[0] and (row[0] == row[1] == row[2]):
-            return row[0]
-    
-    # diagonal
-    if board[0][0] and (board[0][0] == board[1][1] == board[2][2]):
-        return board[0][0]
-    
-    if board[0][2] and (board[0][2] == board[1][1] == board[2][0]):
-        return board[0][2]
-    
-    # cols
-    for i in range(len(board)):
-        if board[0][i] and (board[0][i] == board[1][i] == board[2][i]):
-            return board[0][i]
-        
-    return None
+    if not classic(board, k):
+        return mnk.winner(board, k)
+    return Bitboard.from_rows(board).winner()
 
 
-
-
-def terminal(board):
+def terminal(board, k=3):
     """
     Returns True if game is over, False otherwise.
     """
+    if not classic(board, k):
+        return mnk.terminal(board, k)
+    return Bitboard.from_rows(board).terminal()
 
-    if winner(board) is not None:
-        return True
-    
-    if not actions(board):
-        return True
-    
-    return False
 
-
-def utility(board):
+def utility(board, k=3):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
+    if not classic(board, k):
+        return mnk.utility(board, k)
+    return Bitboard.from_rows(board).utility()
 
-    w = winner(board)
 
-    if w == X:
-        return 1
-    
-    if w == O:
-        return -1
-    
-    return 0
+def minimax(board, k=3, depth=None, evaluate=mnk.evaluate_lines, workers=None, solved=True, stats=None):
+    """
+    Returns the optimal action for the current player on the board.
 
+    Other boards than 3 x 3 with 3 in a row, or any board when `depth`
+    is given, are searched only `depth` moves deep (DEPTH by default),
+    scoring the positions there with `evaluate(board, k)`. With `workers`,
+    that search splits the root moves across as many processes. With
+    `solved` False, 3 x 3 boards are searched instead of looked up.
 
-def minimax(board):
+    If `stats` is a dict, it gets the nodes searched, cutoffs, deepest
+    ply reached, transposition table hits, table answers and seconds
+    taken by this call.
     """
-    Returns the optimal action for the current player on the board.
+    start = time.perf_counter()
+    before = dict(counters)
+    counters["max_depth"] = 0
+
+    action = find_action(board, k, depth, evaluate, workers, solved)
+
+    if stats is not None:
+        for counter in ("nodes", "cutoffs", "hits", "table_hits"):
+            stats[counter] = counters[counter] - before[counter]
+        stats["max_depth"] = counters["max_depth"]
+        stats["seconds"] = time.perf_counter() - start
+    counters["max_depth"] = max(counters["max_depth"], before["max_depth"])
+    return action
+
+
+def find_action(board, k, depth, evaluate, workers, solved):
     """
+    Returns the action minimax chooses, counting the work in `counters`.
+    """
+
+    if depth is not None or not classic(board, k):
+        depth = DEPTH if depth is None else depth
+        if workers:
+            return parallel.best_action(board, k, depth, evaluate, workers, stats=counters)
+        return mnk.best_action(board, k, depth, evaluate, counters)
 
-    if terminal(board):
+    bits = Bitboard.from_rows(board)
+
+    if bits.terminal():
         return None
-    
-    resulting_action = None
 
-    # tic = time.time()
+    # Every reachable position is solved ahead of time
+    entry = table.lookup(bits) if solved else None
+    if entry is not None:
+        counters["table_hits"] += 1
+        return divmod(entry[1], 3)
 
-    if player(board) is X:
-        v = -10 
+    resulting_action = None
 
-        for action in actions(board):
-            value = minvalue(result(board, action), v)
-            if  value > v:
-                v = value
-                resulting_action = action
+    alpha, beta = -10, 10
+
+    if bits.player() is X:
+        for cell in ordered(bits):
+            bits.make(cell)
+            value = minvalue(bits, alpha, beta)
+            bits.unmake()
+            if value > alpha:
+                alpha = value
+                resulting_action = divmod(cell, 3)
 
     else:
-        v = 10 
+        for cell in ordered(bits):
+            bits.make(cell)
+            value = maxvalue(bits, alpha, beta)
+            bits.unmake()
+            if value < beta:
+                beta = value
+                resulting_action = divmod(cell, 3)
 
-        for action in actions(board):
-            value = maxvalue(result(board, action), v)
-            if value < v:
-                v = value
-                resulting_action = action
-    
-    # toc = time.time()
+    return resulting_action
 
-    # print("Elapes time: " + str(toc -tic))
 
-    return resulting_action
+# Alpha-Beta Pruning within the window (alpha, beta)
+# Both search a Bitboard in place, making and unmaking each move
+def maxvalue(bits, alpha, beta):
+    counters["nodes"] += 1
+    counters["max_depth"] = max(counters["max_depth"], len(bits.history))
+    key, _ = bits.canonical()
+    value = probe(key, alpha, beta)
+    if value is not None:
+        return value
+
+    if bits.terminal():
+        v = bits.utility()
+    else:
+        v = -10
+        a = alpha
+
+        for cell in ordered(bits):
+            bits.make(cell)
+            v = max(v, minvalue(bits, a, beta))
+            bits.unmake()
+            a = max(a, v)
+            if a >= beta:
+                cutoff(bits, cell)
+                break
+
+    store(key, v, alpha, beta)
+    return v
 
 
-# Argument c for Alpha-Beta Pruning
-def maxvalue(board, c):
-    if terminal(board):
-        return utility(board)
-    
-    v = -10
-    
-    for action in actions(board):
-        v = max(v, minvalue(result(board, action), v))
-        # Alpha-Beta Pruning:
-        if v >= c:
-            break
 
+def minvalue(bits, alpha, beta):
+    counters["nodes"] += 1
+    counters["max_depth"] = max(counters["max_depth"], len(bits.history))
+    key, _ = bits.canonical()
+    value = probe(key, alpha, beta)
+    if value is not None:
+        return value
+
+    if bits.terminal():
+        v = bits.utility()
+    else:
+        v = 10
+        b = beta
+
+        for cell in ordered(bits):
+            bits.make(cell)
+            v = min(v, maxvalue(bits, alpha, b))
+            bits.unmake()
+            b = min(b, v)
+            if alpha >= b:
+                cutoff(bits, cell)
+                break
+
+    store(key, v, alpha, beta)
     return v
 
 
+def ordered(bits):
+    """
+    Returns the empty cells in the order to search them: the killer
+    move of this ply first, then by history, then center, corners
+    and edges.
+    """
+    killer = killers[len(bits.history)]
+    return sorted(
+        bits.actions(),
+        key=lambda cell: (cell != killer, -history[cell], RANK[cell]),
+    )
+
 
-def minvalue(board, c):
-    if terminal(board):
-        return utility(board)
-    
-    v = 10
+def cutoff(bits, cell):
+    """
+    Remembers a move that cut off the search, as the killer move of its
+    ply and in the history, weighted by how many moves were left.
+    """
+    counters["cutoffs"] += 1
+    killers[len(bits.history)] = cell
+    history[cell] += len(bits.actions()) ** 2
 
-    for action in actions(board):
-        v = min(v, maxvalue(result(board, action), v))
-        # Alpha-Beta Pruning:
-        if v <= c:
-            break
 
-    return v
+def probe(key, alpha, beta):
+    """
+    Returns the stored value of a position if it settles a search
+    between alpha and beta, None otherwise.
+    """
+    counters["lookups"] += 1
+    entry = transpositions.get(key)
+    if entry is None:
+        return None
+
+    kind, value = entry
+    if kind == EXACT or (kind == LOWER and value >= beta) or (kind == UPPER and value <= alpha):
+        counters["hits"] += 1
+        return value
+    return None
+
+
+def store(key, value, alpha, beta):
+    """
+    Stores the value a search between alpha and beta found for a position.
+    A search that was cut off only bounds the true value.
+    """
+    if value <= alpha:
+        kind = UPPER
+    elif value >= beta:
+        kind = LOWER
+    else:
+        kind = EXACT
+
+    # Never replace an exact value with a bound
+    if transpositions.get(key, (None, None))[0] != EXACT:
+        transpositions[key] = (kind, value)
+
+
+def search_stats():
+    """
+    Returns the number of nodes searched, cutoffs, deepest ply reached,
+    transposition table lookups, hits, hit rate and size, and
+    perfect-play table answers since the last reset.
+    """
+    lookups = counters["lookups"]
+    return {
+        "nodes": counters["nodes"],
+        "cutoffs": counters["cutoffs"],
+        "max_depth": counters["max_depth"],
+        "lookups": lookups,
+        "hits": counters["hits"],
+        "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+        "table_size": len(transpositions),
+        "table_hits": counters["table_hits"],
+    }
+
+
+def reset_search(clear_table=False):
+    """
+    Resets the search counters and, if asked, empties the transposition
+    table and the move ordering heuristics.
+    """
+    for counter in counters:
+        counters[counter] = 0
+    if clear_table:
+        transpositions.clear()
+        killers[:] = [None] * len(killers)
+        history[:] = [0] * len(history)
+        mnk.history.clear()